@@ -5,44 +5,182 @@ import pandas as pd
 import plotly.express as px
 
 # Import all our backend functions
-from src.figure_extractor import extract_figures
-from src.visual_analyzer import categorize_figure, extract_keywords, estimate_complexity, parse_table
-from src.image_authenticity import check_image_authenticity
+from src.figure_extractor import iter_figures, make_thumbnail
+from src.figure_triage import FigureIndex, FigureTriage
+from src.analysis_job import AnalysisJob, analyze_figures
+from src.resource_governor import configure
+
+# Longest side, in pixels, of the figure previews sent to the browser
+THUMBNAIL_SIZE = (480, 480)
+
+# Near-duplicate index shared by every analyzed document
+TRIAGE_INDEX_PATH = "figure_index.json"
+
+@st.cache_resource
+def get_figure_index():
+    """
+    One near-duplicate index per server process, shared by every session, so
+    overlapping runs add to the same entries instead of overwriting each other.
+    """
+    return FigureIndex(TRIAGE_INDEX_PATH)
+
+# Sessions expected to analyze documents at the same time in the server process.
+# Each governed stage gets 1/N of the cores, and at most N run at once.
+CONCURRENT_SESSIONS = 2
+
+@st.cache_resource
+def apply_resource_budget():
+    """
+    Sets thread budgets once per server process. Sessions share the process, so
+    their heavy stages share the cores instead of each using all of them.
+    """
+    return configure(workers=1, concurrent_jobs=CONCURRENT_SESSIONS, model_concurrency=1)
 
 # Use Streamlit's caching to avoid re-running the full analysis on every interaction
 @st.cache_data
-def run_full_analysis(pdf_path):
+def run_full_analysis(pdf_path, use_triage=True, source_name=None):
     """
     Runs the entire backend pipeline from PDF to structured metadata.
+    `source_name` is the uploaded file's name, used in place of the temporary path.
+    Returns the figure data and the triage report (None without triage).
     """
+    triage = FigureTriage(get_figure_index()) if use_triage else None
+
     # Phase 1: Extract figures, captions, and OCR text
-    figure_data = extract_figures(pdf_path)
-
-    # Phases 2 & 3: Analyze each figure
-    for data in figure_data:
-        image_path = data["image_path"]
-        ocr_text = data["ocr_text"]
-        caption = data["caption"]
-
-        # Run metadata enrichment and complexity scoring
-        data["category"] = categorize_figure(image_path, ocr_text)
-        data["keywords"] = extract_keywords(caption)
-        data["complexity_score"] = estimate_complexity(image_path, ocr_text)
-
-        # Run authenticity check
-        auth_label, auth_score = check_image_authenticity(image_path)
-        data["authenticity_label"] = auth_label
-        data["authenticity_score"] = auth_score
-
-        # If it's a table, try to parse it
-        if data["category"] == "table":
-            data["table_data"] = parse_table(image_path)
+    # Phases 2 & 3: Analyze each figure as it is extracted
+    # Figures go to a private folder, so other sessions' runs can't overwrite them
+    figure_data = []
+    with tempfile.TemporaryDirectory(prefix="analysis_") as output_dir:
+        for data in analyze_figures(iter_figures(pdf_path, output_dir, triage=triage, source_name=source_name), triage):
+            data["thumbnail"] = make_thumbnail(data["image_path"], THUMBNAIL_SIZE)
+            figure_data.append(data)
+
+    if triage is None:
+        return figure_data, None
+    triage.save()
+    return figure_data, triage.report()
+
+def show_triage_report(report):
+    """
+    Shows how many images the pre-filter skipped, per rule, and the time it saved.
+    """
+    if not report:
+        return
+    skipped = sum(report["skipped"].values())
+    with st.expander(f"Pre-filter: {skipped} images skipped, {report['reused']} duplicates reused"):
+        for rule, count in sorted(report["skipped"].items()):
+            st.write(f"- Skipped by **{rule}**: {count}")
+        st.write(f"Estimated time saved: {report['estimated_seconds_saved']:.1f}s")
+
+def show_summary(analysis_results):
+    """
+    Shows the pie chart of human vs. AI-generated figures.
+    """
+    st.header("Overall Authenticity Summary")
+
+    if not analysis_results:
+        st.warning("No figures were found in this PDF.")
+        return
+
+    # Aggregate the results for the pie chart
+    labels = [res['authenticity_label'] for res in analysis_results]
+    human_count = labels.count('Human-created')
+    ai_count = labels.count('AI-generated image')
+
+    if human_count + ai_count > 0:
+        pie_data = pd.DataFrame({
+            'Category': ['Human-created', 'AI-generated'],
+            'Count': [human_count, ai_count]
+        })
+        fig = px.pie(pie_data, values='Count', names='Category',
+                     title='Ratio of Human vs. AI-Generated Figures',
+                     color_discrete_map={'Human-created':'green', 'AI-generated':'red'})
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Could not determine authenticity for any figures.")
+
+def show_figure_card(index, data):
+    """
+    Shows one analyzed figure: thumbnail, scores, category, caption and extracted data.
+    """
+    st.subheader(f"Figure {index + 1}")
+    col1, col2 = st.columns([1, 1.5])
+    with col1:
+        # Send the server-side thumbnail rather than the full-resolution PNG
+        st.image(data["thumbnail"])
+    with col2:
+        st.metric(label="Complexity Score", value=f"{data['complexity_score']}/10")
+        auth_label = data['authenticity_label']
+        auth_score = data['authenticity_score']
+        if "AI-generated" in auth_label:
+            st.error(f"Authenticity: {auth_label} (Confidence: {auth_score:.2f})")
+        else:
+            st.success(f"Authenticity: {auth_label} (Confidence: {auth_score:.2f})")
+        st.info(f"Detected Category: **{data['category'].upper()}**")
+        if data.get("reused_from"):
+            st.caption(f"Results reused from a near-duplicate figure ({data['reused_from']}).")
+        if data["caption"]:
+            st.caption(f"Detected Caption: {data['caption']}")
+            if data["keywords"]:
+                st.write("**Keywords:**")
+                st.write(", ".join(data["keywords"]))
         else:
-            data["table_data"] = None
-            
-    return figure_data
+            st.caption("No caption found for this figure.")
+    with st.expander("Show Text Extracted from Figure (OCR)"):
+        st.text(data["ocr_text"] if data["ocr_text"] else "No text found in this figure.")
+    if data["table_data"]:
+        with st.expander("Show Parsed Table Data (CSV)"):
+            df = pd.DataFrame(data["table_data"])
+            st.dataframe(df)
+
+def show_results(analysis_results):
+    show_summary(analysis_results)
+
+    # --- DISPLAY DETAILED RESULTS ---
+    st.header("Detailed Figure-by-Figure Analysis")
+
+    if analysis_results:
+        st.info(f"Found {len(analysis_results)} figures. See details below:")
+        for i, data in enumerate(analysis_results):
+            show_figure_card(i, data)
+
+@st.fragment(run_every=1.0)
+def show_job_progress(job):
+    """
+    Polls the background job and renders every figure finished so far.
+    Only this fragment reruns on each tick, not the whole page.
+    """
+    results, total, done, error = job.snapshot()
+    # Images dropped by the pre-filter never produce a card but still count as handled
+    skipped = sum(job.triage.report()["skipped"].values()) if job.triage else 0
+    handled = len(results) + skipped
+
+    if done:
+        # Switch to the final, non-polling view
+        st.rerun()
+
+    if total is None:
+        st.progress(0.0, text="Counting figures...")
+    elif total == 0:
+        st.progress(1.0, text="No embedded images found.")
+    else:
+        st.progress(min(handled / total, 1.0), text=f"Processed {handled} of {total} images...")
+
+    if job.cancelled:
+        st.warning("Cancelling after the current figure...")
+    elif st.button("Cancel analysis"):
+        job.cancel()
+
+    if error:
+        st.error(f"Analysis failed: {error}")
+
+    st.header("Detailed Figure-by-Figure Analysis")
+    for i, data in enumerate(results):
+        show_figure_card(i, data)
 
 def main():
+    apply_resource_budget()
+
     # --- PAGE CONFIGURATION ---
     st.set_page_config(
         page_title="Scientific PDF Visuals Unlocker",
@@ -63,76 +201,60 @@ def main():
 
     # --- ANALYSIS WORKFLOW ---
     if uploaded_file is not None:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_pdf_path = tmp_file.name
-
         st.success(f"File '{uploaded_file.name}' uploaded successfully.")
-        
+
+        background = st.toggle(
+            "Stream results as each figure finishes",
+            value=True,
+            help="Runs the analysis in the background so figures appear one by one and the run can be cancelled."
+        )
+        use_triage = st.toggle(
+            "Skip icons, logos and duplicate figures",
+            value=True,
+            help="Drops tiny, thin or blank images before analysis and reuses results for near-duplicate figures."
+        )
+
         if st.button("Analyze PDF"):
-            with st.spinner("Running full analysis pipeline... This may take a few minutes."):
-                analysis_results = run_full_analysis(tmp_pdf_path)
-            
-            st.success("Full analysis complete!")
-            
-            # --- DISPLAY SUMMARY VISUALIZATION ---
-            st.header("Overall Authenticity Summary")
-            
-            if not analysis_results:
-                st.warning("No figures were found in this PDF.")
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+                tmp_file.write(uploaded_file.getvalue())
+                tmp_pdf_path = tmp_file.name
+
+            previous_job = st.session_state.pop("analysis_job", None)
+            if previous_job is not None:
+                previous_job.cancel()
+
+            if background:
+                # The job owns the temporary PDF and deletes it when it finishes
+                st.session_state["analysis_job"] = AnalysisJob(
+                    tmp_pdf_path, thumbnail_size=THUMBNAIL_SIZE, delete_pdf=True,
+                    triage=FigureTriage(get_figure_index()) if use_triage else None,
+                    source_name=uploaded_file.name
+                ).start()
             else:
-                # Aggregate the results for the pie chart
-                labels = [res['authenticity_label'] for res in analysis_results]
-                human_count = labels.count('Human-created')
-                ai_count = labels.count('AI-generated image')
-
-                if human_count + ai_count > 0:
-                    pie_data = pd.DataFrame({
-                        'Category': ['Human-created', 'AI-generated'],
-                        'Count': [human_count, ai_count]
-                    })
-                    fig = px.pie(pie_data, values='Count', names='Category',
-                                 title='Ratio of Human vs. AI-Generated Figures',
-                                 color_discrete_map={'Human-created':'green', 'AI-generated':'red'})
-                    st.plotly_chart(fig, use_container_width=True)
+                with st.spinner("Running full analysis pipeline... This may take a few minutes."):
+                    analysis_results, triage_report = run_full_analysis(tmp_pdf_path, use_triage, uploaded_file.name)
+                if os.path.exists(tmp_pdf_path):
+                    os.remove(tmp_pdf_path)
+
+                st.success("Full analysis complete!")
+                show_triage_report(triage_report)
+                show_results(analysis_results)
+
+        job = st.session_state.get("analysis_job")
+        if job is not None:
+            if job.done:
+                results, _, _, error = job.snapshot()
+                if error:
+                    st.error(f"Analysis failed: {error}")
+                elif job.cancelled:
+                    st.warning(f"Analysis cancelled. Showing the {len(results)} figures finished before cancelling.")
                 else:
-                    st.info("Could not determine authenticity for any figures.")
-
-            # --- DISPLAY DETAILED RESULTS ---
-            st.header("Detailed Figure-by-Figure Analysis")
-            
-            if analysis_results:
-                st.info(f"Found {len(analysis_results)} figures. See details below:")
-                for i, data in enumerate(analysis_results):
-                    st.subheader(f"Figure {i + 1}")
-                    col1, col2 = st.columns([1, 1.5])
-                    with col1:
-                        st.image(data["image_path"])
-                    with col2:
-                        st.metric(label="Complexity Score", value=f"{data['complexity_score']}/10")
-                        auth_label = data['authenticity_label']
-                        auth_score = data['authenticity_score']
-                        if "AI-generated" in auth_label:
-                            st.error(f"Authenticity: {auth_label} (Confidence: {auth_score:.2f})")
-                        else:
-                            st.success(f"Authenticity: {auth_label} (Confidence: {auth_score:.2f})")
-                        st.info(f"Detected Category: **{data['category'].upper()}**")
-                        if data["caption"]:
-                            st.caption(f"Detected Caption: {data['caption']}")
-                            if data["keywords"]:
-                                st.write("**Keywords:**")
-                                st.write(", ".join(data["keywords"]))
-                        else:
-                            st.caption("No caption found for this figure.")
-                    with st.expander("Show Text Extracted from Figure (OCR)"):
-                        st.text(data["ocr_text"] if data["ocr_text"] else "No text found in this figure.")
-                    if data["table_data"]:
-                        with st.expander("Show Parsed Table Data (CSV)"):
-                            df = pd.DataFrame(data["table_data"])
-                            st.dataframe(df)
-        
-        if os.path.exists(tmp_pdf_path):
-             os.remove(tmp_pdf_path)
+                    st.success("Full analysis complete!")
+                if job.triage is not None:
+                    show_triage_report(job.triage.report())
+                show_results(results)
+            else:
+                show_job_progress(job)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,106 @@
+"""
+Early-exit rate, throughput and agreement of the detection cascade against the
+full text pipeline (full-context perplexity, burstiness and RoBERTa).
+
+The labeled set is split: one part calibrates the cascade, the rest is scored.
+Fact-checking is left out of both sides because it needs network access.
+Run from the repository root:
+    python -m benchmarks.bench_cascade --labeled labeled_texts.jsonl
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.harness import save_baseline
+
+def run_full_pipeline(text):
+    from src.model_detector import predict_text_class
+    from src.text_analyzer import calculate_burstiness, calculate_perplexity
+
+    calculate_perplexity(text)
+    calculate_burstiness(text)
+    return predict_text_class(text)[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labeled", required=True, help='JSONL of {"text": ..., "label": ...} lines')
+    parser.add_argument("--calibration-fraction", type=float, default=0.5)
+    parser.add_argument("--perplexity-tokens", type=int, default=None, help="context of the cheap perplexity stage")
+    parser.add_argument("--stub-models", action="store_true", help="use the stub models from benchmarks/stubs.py")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", metavar="NAME", help="save results to benchmarks/baselines/NAME.json")
+    args = parser.parse_args(argv)
+
+    if args.stub_models:
+        from benchmarks.stubs import install_model_stubs
+        install_model_stubs()
+    from src.detection_cascade import CHEAP_PERPLEXITY_TOKENS, DetectionCascade, load_labeled_set
+
+    texts, labels = load_labeled_set(args.labeled)
+    texts = [" ".join(text.split()[:500]) for text in texts]
+    order = list(range(len(texts)))
+    random.Random(args.seed).shuffle(order)
+    split = int(len(order) * args.calibration_fraction)
+    calibration_ids, evaluation_ids = order[:split], order[split:]
+
+    cascade = DetectionCascade.calibrate(
+        [texts[i] for i in calibration_ids], [labels[i] for i in calibration_ids],
+        perplexity_tokens=args.perplexity_tokens or CHEAP_PERPLEXITY_TOKENS,
+    )
+    for stage in cascade.calibration["stages"]:
+        print(f"{stage['name']}: uncertainty band {stage['band'][0]:.2f} - {stage['band'][1]:.2f}")
+
+    # Warm-up so model construction isn't charged to whichever side runs first
+    run_full_pipeline(texts[evaluation_ids[0]])
+    cascade.classify(texts[evaluation_ids[0]])
+
+    full_labels, full_seconds = [], 0.0
+    for i in evaluation_ids:
+        started = time.perf_counter()
+        full_labels.append(run_full_pipeline(texts[i]))
+        full_seconds += time.perf_counter() - started
+
+    cascade_results, cascade_seconds = [], 0.0
+    for i in evaluation_ids:
+        started = time.perf_counter()
+        cascade_results.append(cascade.classify(texts[i]))
+        cascade_seconds += time.perf_counter() - started
+
+    count = len(evaluation_ids)
+    exits = {}
+    for result in cascade_results:
+        exits[result["exit_stage"]] = exits.get(result["exit_stage"], 0) + 1
+    early = count - exits.get("roberta", 0)
+    truth = ["AI-Generated" if labels[i] else "Human" for i in evaluation_ids]
+    cascade_labels = [result["label"] for result in cascade_results]
+
+    summary = {
+        "documents": count,
+        "early_exit_fraction": early / count,
+        "exits_by_stage": exits,
+        "full_docs_per_second": count / full_seconds,
+        "cascade_docs_per_second": count / cascade_seconds,
+        "speedup": full_seconds / cascade_seconds,
+        "agreement_with_full": sum(a == b for a, b in zip(cascade_labels, full_labels)) / count,
+        "full_accuracy": sum(a == b for a, b in zip(full_labels, truth)) / count,
+        "cascade_accuracy": sum(a == b for a, b in zip(cascade_labels, truth)) / count,
+    }
+
+    print(f"\nEvaluated {count} documents ({len(calibration_ids)} used for calibration)")
+    print(f"-> Early exits: {early} ({summary['early_exit_fraction']:.0%})")
+    for stage, stage_count in sorted(exits.items()):
+        print(f"   {stage}: {stage_count}")
+    print(f"-> Throughput: {summary['full_docs_per_second']:.2f} docs/s full, "
+          f"{summary['cascade_docs_per_second']:.2f} docs/s cascade ({summary['speedup']:.2f}x)")
+    print(f"-> Agreement with full pipeline: {summary['agreement_with_full']:.1%}")
+    print(f"-> Accuracy vs. labels: {summary['full_accuracy']:.1%} full, {summary['cascade_accuracy']:.1%} cascade")
+
+    if args.save_baseline:
+        path = save_baseline({"cascade": summary}, args.save_baseline,
+                             {"benchmark": "cascade", "calibration": cascade.calibration})
+        print(f"\nResults saved to '{path}'")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
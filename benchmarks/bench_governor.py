@@ -0,0 +1,123 @@
+"""
+Throughput of the full per-document pipeline with the CPU resource governor on
+and off, across process-pool sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_governor --workers 1 2 4 8 --documents 16
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.fixtures import make_synthetic_pdf
+from benchmarks.harness import save_baseline
+
+# A mix of document shapes so every stage (OCR, OpenCV, models) gets exercised
+DOCUMENT_MIX = [
+    dict(pages=3, images_per_page=2, image_size=(600, 450)),
+    dict(pages=2, images_per_page=1, tables_per_page=1, image_size=(900, 600)),
+]
+
+def _init_worker(governed, workers, stub_models):
+    if stub_models:
+        from benchmarks.stubs import install_model_stubs
+        install_model_stubs()
+    if governed:
+        from src.resource_governor import worker_initializer
+        worker_initializer(workers)
+
+def analyze_pdf_task(pdf_path):
+    """
+    Runs figure analysis plus the text detectors on one PDF inside a worker.
+
+    Returns:
+        float: CPU seconds this worker process and its Tesseract child
+               processes spent on the document.
+    """
+    import fitz  # PyMuPDF
+    from src.analysis_job import analyze_figure
+    from src.figure_extractor import extract_figures
+    from src.model_detector import predict_text_class
+    from src.resource_governor import child_cpu_seconds
+    from src.text_analyzer import calculate_perplexity
+
+    cpu_start = time.process_time()
+    child_cpu_start = child_cpu_seconds()
+    output_dir = tempfile.mkdtemp(prefix="governor_figs_")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for data in extract_figures(pdf_path, output_dir):
+                analyze_figure(data)
+            with fitz.open(pdf_path) as doc:
+                text = " ".join(" ".join(page.get_text("text") for page in doc).split()[:500])
+            calculate_perplexity(text)
+            predict_text_class(text)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return (time.process_time() - cpu_start) + (child_cpu_seconds() - child_cpu_start)
+
+def measure(pdf_paths, workers, governed, stub_models, repeat):
+    """
+    Times `repeat` passes over all documents in one pool, after a warm-up pass.
+    """
+    context = multiprocessing.get_context("spawn")
+    cores = os.cpu_count() or 1
+    passes = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(governed, workers, stub_models)) as pool:
+        # Warm-up: imports, model construction and first-call overheads
+        list(pool.map(analyze_pdf_task, pdf_paths[:workers]))
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cpu_seconds = sum(pool.map(analyze_pdf_task, pdf_paths))
+            wall = time.perf_counter() - start
+            passes.append({
+                "docs_per_second": len(pdf_paths) / wall,
+                "cpu_utilization": cpu_seconds / (wall * cores),
+            })
+    return {
+        "docs_per_second": statistics.median(p["docs_per_second"] for p in passes),
+        "cpu_utilization": statistics.median(p["cpu_utilization"] for p in passes),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--documents", type=int, default=8, help="documents per timed pass")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per configuration")
+    parser.add_argument("--real-models", action="store_true", help="use the real models instead of stubs")
+    parser.add_argument("--save-baseline", metavar="NAME", help="save results to benchmarks/baselines/NAME.json")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="governor_bench_")
+    results = {}
+    try:
+        pdf_paths = [
+            make_synthetic_pdf(os.path.join(workdir, f"doc_{i}.pdf"), seed=i, **DOCUMENT_MIX[i % len(DOCUMENT_MIX)])
+            for i in range(args.documents)
+        ]
+        print(f"{'workers':>7} {'governor':>9} {'docs/s':>8} {'CPU util':>9}")
+        for workers in sorted(set(args.workers)):
+            for governed in (False, True):
+                row = measure(pdf_paths, workers, governed, not args.real_models, args.repeat)
+                results[f"workers={workers}/governor={'on' if governed else 'off'}"] = row
+                print(f"{workers:>7} {'on' if governed else 'off':>9} "
+                      f"{row['docs_per_second']:>8.2f} {row['cpu_utilization']:>9.0%}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        path = save_baseline(results, args.save_baseline, {"benchmark": "governor"})
+        print(f"\nResults saved to '{path}'")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
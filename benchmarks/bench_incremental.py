@@ -0,0 +1,98 @@
+"""
+Full vs. incremental re-analysis of a revised PDF.
+
+A v2 is made from a local copy of the input by editing the text on the first
+page, adding a figure to a middle page and appending a page. v1 is analyzed
+once to get its record. v2 is then timed both from scratch and incrementally
+from that record.
+Run from the repository root:
+    python -m benchmarks.bench_incremental --pdf 2509.10564v1.pdf
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+import fitz  # PyMuPDF
+
+from benchmarks.fixtures import PAGE_WIDTH, image_to_png_bytes, make_chart_image, make_sentences, make_synthetic_pdf
+from benchmarks.harness import print_results, save_baseline, time_stage
+
+def make_revision(v1_path, v2_path, seed=1):
+    """
+    Writes a revised copy of `v1_path` with one text edit, one new figure and one new page.
+    """
+    rng = random.Random(seed)
+    with fitz.open(v1_path) as doc:
+        doc[0].insert_text((50, 30), "Revised manuscript (v2).", fontsize=8)
+        middle = doc[len(doc) // 2]
+        new_figure = image_to_png_bytes(make_chart_image(rng, (600, 450)))
+        middle.insert_image(fitz.Rect(PAGE_WIDTH - 230, 60, PAGE_WIDTH - 30, 210), stream=new_figure)
+        appended = doc.new_page(width=doc[0].rect.width, height=doc[0].rect.height)
+        appended.insert_textbox(fitz.Rect(50, 50, appended.rect.width - 50, 400), make_sentences(rng, 20), fontsize=9)
+        doc.save(v2_path)
+    return v2_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="PDF to revise (defaults to a synthetic 8-page document)")
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--real-models", action="store_true", help="use the real models instead of stubs")
+    parser.add_argument("--save-baseline", metavar="NAME", help="save results to benchmarks/baselines/NAME.json")
+    args = parser.parse_args(argv)
+
+    if not args.real_models:
+        from benchmarks.stubs import install_model_stubs
+        install_model_stubs()
+    from src.incremental import analyze_revision, print_diff_report
+
+    workdir = tempfile.mkdtemp(prefix="incremental_bench_")
+    try:
+        v1_path = os.path.join(workdir, "paper_v1.pdf")
+        if args.pdf:
+            shutil.copy(args.pdf, v1_path)
+        else:
+            make_synthetic_pdf(v1_path, pages=8, images_per_page=2, image_size=(600, 450))
+        v2_path = make_revision(v1_path, os.path.join(workdir, "paper_v2.pdf"))
+
+        def quiet_revision(pdf_path, previous_record):
+            output_dir = tempfile.mkdtemp(dir=workdir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                return analyze_revision(pdf_path, previous_record, output_dir)
+
+        v1_record, _ = quiet_revision(v1_path, None)
+        results = {
+            "v2/full": time_stage(quiet_revision, v2_path, None, warmup=args.warmup, repeat=args.repeat),
+            "v2/incremental": time_stage(quiet_revision, v2_path, v1_record, warmup=args.warmup, repeat=args.repeat),
+        }
+
+        full_record, _ = quiet_revision(v2_path, None)
+        incremental_record, report = quiet_revision(v2_path, v1_record)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_diff_report(report)
+    print()
+    print_results(results)
+    speedup = results["v2/full"]["median"] / results["v2/incremental"]["median"]
+    print(f"\nIncremental re-analysis is {speedup:.1f}x faster than a full run.")
+
+    # The merged record should describe the same figures as a full run
+    def summary(record):
+        return [(data["page"], data["category"], data["authenticity_label"]) for data in record["figures"]]
+    matches = summary(full_record) == summary(incremental_record)
+    print(f"Merged figures match a full run: {'yes' if matches else 'no'} "
+          f"({len(incremental_record['figures'])} figures)")
+
+    if args.save_baseline:
+        path = save_baseline(results, args.save_baseline, {"benchmark": "incremental", "diff": report})
+        print(f"Results saved to '{path}'")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
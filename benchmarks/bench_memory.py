@@ -0,0 +1,108 @@
+"""
+Peak resident memory of figure and image extraction on PDFs with huge embedded
+images, with the size-aware decoder and with decoding at native resolution.
+
+Each measurement runs in a fresh process so its peak RSS is not shared.
+Native-resolution runs write every image back out as a full-size PNG, so the
+run needs roughly side x side x 0.75 x 3 bytes of temporary disk per image
+(about 144 MB at the default 8000 px, 324 MB at 12000 px).
+Run from the repository root:
+    python -m benchmarks.bench_memory --side 8000
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import make_synthetic_pdf
+from benchmarks.harness import save_baseline
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _measure_in_child(stage, pdf_path, bounded, with_ocr, queue):
+    from src import figure_extractor
+    from src.image_decoding import ImageDecoder
+    from src.process_pdf import process_scholarly_pdf
+
+    if not with_ocr:
+        # Tesseract on a native-resolution plate takes minutes and runs in its own process
+        figure_extractor.ocr_text_from_image = lambda image_path, **kwargs: ""
+    decoder = ImageDecoder() if bounded else ImageDecoder(max_side=None, max_image_mb=None)
+    baseline_mb = _peak_rss_mb()
+    output_dir = os.path.join(tempfile.mkdtemp(prefix="memory_bench_"), "out")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if stage == "extract_figures":
+            figure_extractor.extract_figures(pdf_path, output_dir, decoder=decoder)
+        else:
+            process_scholarly_pdf(pdf_path, output_dir, decoder=decoder)
+    seconds = time.perf_counter() - start
+
+    shutil.rmtree(os.path.dirname(output_dir), ignore_errors=True)
+    queue.put({
+        "peak_rss_mb": _peak_rss_mb(),
+        "import_rss_mb": baseline_mb,
+        "seconds": seconds,
+        "decoder": decoder.stats(),
+    })
+
+def measure(stage, pdf_path, bounded, with_ocr):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure_in_child, args=(stage, pdf_path, bounded, with_ocr, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--side", type=int, default=8000, help="long side in pixels of each huge image")
+    parser.add_argument("--images", type=int, default=1, help="huge images in the PDF")
+    parser.add_argument("--with-ocr", action="store_true", help="also run Tesseract on the extracted figures")
+    parser.add_argument("--save-baseline", metavar="NAME", help="save results to benchmarks/baselines/NAME.json")
+    args = parser.parse_args(argv)
+
+    size = (args.side, args.side * 3 // 4)
+    workdir = tempfile.mkdtemp(prefix="memory_fixtures_")
+    results = {}
+    try:
+        for image_format in ("JPEG", "PNG"):
+            pdf_path = make_synthetic_pdf(os.path.join(workdir, f"huge_{image_format.lower()}.pdf"), pages=1,
+                                          images_per_page=args.images, image_size=size, image_format=image_format)
+            print(f"{image_format}: {args.images} images of {size[0]}x{size[1]} px "
+                  f"({os.path.getsize(pdf_path) / 1e6:.1f} MB PDF)")
+            print(f"{'stage':<16} {'decoder':<8} {'peak RSS (MB)':>14} {'above import':>13} {'time (s)':>9} "
+                  f"{'reduced':>8} {'largest decode (MB)':>20} {'avoided (MB)':>13}  fallbacks")
+            for stage in ("extract_figures", "process_pdf"):
+                for bounded in (False, True):
+                    row = measure(stage, pdf_path, bounded, args.with_ocr)
+                    mode = "bounded" if bounded else "native"
+                    results[f"{image_format.lower()}/{stage}/{mode}"] = row
+                    print(f"{stage:<16} {mode:<8} {row['peak_rss_mb']:>14.0f} "
+                          f"{row['peak_rss_mb'] - row['import_rss_mb']:>13.0f} "
+                          f"{row['seconds']:>9.2f} {row['decoder']['reduced']:>8} "
+                          f"{row['decoder']['peak_decoded_bytes'] / 1e6:>20.0f} "
+                          f"{row['decoder']['bytes_avoided'] / 1e6:>13.0f}  "
+                          f"clip={row['decoder']['clip_renders']} full={row['decoder']['unbounded_decodes']}")
+            print()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        path = save_baseline(results, args.save_baseline, {"benchmark": "memory", "image_size": size})
+        print(f"Results saved to '{path}'")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import fitz  # PyMuPDF
+import io
+import os
+import random
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Word list used to build deterministic body text and captions
+WORDS = (
+    "model data analysis results method sample protein cell network signal "
+    "temperature growth response structure learning training dataset accuracy "
+    "figure table experiment measurement error variance effect study observed "
+    "significant increase decrease compared baseline proposed approach system"
+).split()
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+
+def make_sentences(rng, count, min_words=6, max_words=28):
+    """
+    Builds `count` pseudo-random sentences with varying lengths.
+    """
+    sentences = []
+    for _ in range(count):
+        length = rng.randint(min_words, max_words)
+        words = [rng.choice(WORDS) for _ in range(length)]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+def make_chart_image(rng, size):
+    """
+    Draws a simple line chart with axis labels as an RGB image.
+    """
+    width, height = size
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    draw.line([(40, 10), (40, height - 30), (width - 10, height - 30)], fill="black", width=2)
+    for series in range(3):
+        color = ["red", "blue", "green"][series]
+        points = [(40 + x * (width - 50) // 20, rng.randint(10, height - 40)) for x in range(21)]
+        draw.line(points, fill=color, width=2)
+    for tick in range(0, 21, 5):
+        x = 40 + tick * (width - 50) // 20
+        draw.text((x, height - 25), str(tick * 10), fill="black")
+    return image
+
+def make_photo_image(rng, size):
+    """
+    Generates a noisy, photo-like image (high entropy, no text).
+    """
+    width, height = size
+    np_rng = np.random.default_rng(rng.randint(0, 2**31))
+    base = np_rng.integers(0, 256, size=(max(height // 8, 1), max(width // 8, 1), 3), dtype=np.uint8)
+    image = Image.fromarray(base).resize(size, Image.BILINEAR)
+    return image
+
+def make_table_image(rng, size, rows=12, cols=18):
+    """
+    Draws a ruled table filled with numbers, which `is_table` should detect.
+    """
+    width, height = size
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    row_h = height / rows
+    col_w = width / cols
+    for r in range(rows + 1):
+        y = min(int(r * row_h), height - 1)
+        draw.line([(0, y), (width, y)], fill="black", width=2)
+    for c in range(cols + 1):
+        x = min(int(c * col_w), width - 1)
+        draw.line([(x, 0), (x, height)], fill="black", width=2)
+    for r in range(rows):
+        for c in range(cols):
+            draw.text((int(c * col_w) + 4, int(r * row_h) + 4), str(rng.randint(0, 999)), fill="black")
+    return image
+
+def image_to_png_bytes(image, image_format="PNG"):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format)
+    return buffer.getvalue()
+
+def make_synthetic_pdf(pdf_path, pages=4, images_per_page=2, image_size=(800, 600),
+                       tables_per_page=0, caption_density=1.0, junk_per_page=0,
+                       duplicates_per_page=0, image_format="PNG", seed=0):
+    """
+    Writes a synthetic scholarly-looking PDF for benchmarking.
+
+    Args:
+        pdf_path (str): Where to save the PDF.
+        pages (int): Number of pages.
+        images_per_page (int): Chart/photo figures embedded on each page.
+        image_size (tuple): Native (width, height) in pixels of each embedded image.
+        tables_per_page (int): Ruled table images embedded on each page.
+        caption_density (float): Fraction of figures that get a "Figure N." caption.
+        junk_per_page (int): Non-figure images per page, cycling through a header
+            logo, a thin separator strip and a blank panel.
+        duplicates_per_page (int): Extra copies of the page's first figure.
+        image_format (str): PIL format figures are embedded as ("PNG" or "JPEG").
+        seed (int): Seed so the same parameters always produce the same file.
+
+    Returns:
+        str: The path of the written PDF.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    figure_number = 0
+
+    for _ in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        text_rect = fitz.Rect(50, 40, PAGE_WIDTH - 50, 200)
+        page.insert_textbox(text_rect, make_sentences(rng, 12), fontsize=8)
+
+        for junk in range(junk_per_page):
+            if junk % 3 == 0:
+                logo_rect = fitz.Rect(PAGE_WIDTH - 40 - 24 * junk, 8, PAGE_WIDTH - 20 - 24 * junk, 28)
+                page.insert_image(logo_rect, stream=image_to_png_bytes(make_chart_image(rng, (64, 64))))
+            elif junk % 3 == 1:
+                strip_rect = fitz.Rect(50, 202, PAGE_WIDTH - 50, 206)
+                page.insert_image(strip_rect, stream=image_to_png_bytes(Image.new("RGB", (1000, 8), "gray")),
+                                  keep_proportion=False)
+
+        kinds = ["chart" if i % 2 == 0 else "photo" for i in range(images_per_page)]
+        kinds += ["table"] * tables_per_page
+        kinds += ["blank"] * len(range(2, junk_per_page, 3))
+        if images_per_page:
+            kinds += ["duplicate"] * duplicates_per_page
+        if not kinds:
+            continue
+
+        first_figure = None
+
+        slot_height = (PAGE_HEIGHT - 240) / len(kinds)
+        for slot, kind in enumerate(kinds):
+            top = 210 + slot * slot_height
+            image_rect = fitz.Rect(80, top, PAGE_WIDTH - 80, top + slot_height * 0.75)
+            if kind == "blank":
+                blank = Image.new("RGB", image_size, "white")
+                page.insert_image(image_rect, stream=image_to_png_bytes(blank), keep_proportion=False)
+                continue
+            if kind == "duplicate":
+                # One changed pixel: a near-duplicate that PyMuPDF can't merge into the same xref
+                image = first_figure.copy()
+                image.putpixel((0, 0), (rng.randint(0, 255), 0, 0))
+            elif kind == "table":
+                image = make_table_image(rng, image_size)
+            elif kind == "chart":
+                image = make_chart_image(rng, image_size)
+            else:
+                image = make_photo_image(rng, image_size)
+            if first_figure is None:
+                first_figure = image
+            page.insert_image(image_rect, stream=image_to_png_bytes(image, image_format), keep_proportion=False)
+
+            figure_number += 1
+            if rng.random() < caption_density:
+                label = "Table" if kind == "table" else "Figure"
+                caption = f"{label} {figure_number}. " + make_sentences(rng, 1, 5, 12)
+                caption_rect = fitz.Rect(80, image_rect.y1 + 2, PAGE_WIDTH - 80, top + slot_height)
+                page.insert_textbox(caption_rect, caption, fontsize=7)
+
+    os.makedirs(os.path.dirname(os.path.abspath(pdf_path)), exist_ok=True)
+    # Without deflate, PyMuPDF stores non-JPEG images as raw, unfiltered pixels
+    doc.save(pdf_path, garbage=3, deflate=True)
+    doc.close()
+    return pdf_path
+
+# Scenarios exercised by the benchmark runner, keyed by name
+SCENARIOS = {
+    "small": dict(pages=2, images_per_page=1, image_size=(400, 300)),
+    "many_pages": dict(pages=20, images_per_page=1, image_size=(400, 300)),
+    "many_images": dict(pages=4, images_per_page=6, image_size=(400, 300)),
+    "large_images": dict(pages=2, images_per_page=2, image_size=(2400, 1800)),
+    "tables": dict(pages=3, images_per_page=1, tables_per_page=2, image_size=(900, 600)),
+    "sparse_captions": dict(pages=4, images_per_page=3, image_size=(600, 450), caption_density=0.2),
+    "junk_and_duplicates": dict(pages=4, images_per_page=2, image_size=(600, 450), junk_per_page=3,
+                                duplicates_per_page=1),
+}
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    for name, params in SCENARIOS.items():
+        path = make_synthetic_pdf(os.path.join("bench_fixtures", f"{name}.pdf"), **params)
+        print(f"Wrote '{path}'")
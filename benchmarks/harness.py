@@ -0,0 +1,108 @@
+import json
+import os
+import platform
+import statistics
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+def time_stage(fn, *args, warmup=1, repeat=5, **kwargs):
+    """
+    Times `fn(*args, **kwargs)` after `warmup` untimed calls.
+
+    Returns:
+        dict: Timing summary in seconds (median, mean, min, max, stdev) plus the
+              number of timed repetitions.
+    """
+    for _ in range(warmup):
+        fn(*args, **kwargs)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+
+    return {
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+    }
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+def save_baseline(results, name, extra=None):
+    """
+    Saves stage timings as a named baseline under `benchmarks/baselines/`.
+    """
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    payload = {"machine": machine_info(), "results": results}
+    if extra:
+        payload.update(extra)
+    path = baseline_path(name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return path
+
+def load_baseline(name):
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compare_to_baseline(results, baseline, tolerance=0.10, noise_sigmas=3.0):
+    """
+    Classifies each stage as 'regression', 'improvement' or 'unchanged'.
+
+    A change only counts when the median moves by more than `tolerance` (relative)
+    AND by more than `noise_sigmas` standard deviations of the two runs combined,
+    so ordinary jitter between repetitions is not reported as a regression.
+
+    Returns:
+        list: One dict per stage present in both runs.
+    """
+    comparisons = []
+    for stage, current in results.items():
+        previous = baseline["results"].get(stage)
+        if previous is None:
+            continue
+        delta = current["median"] - previous["median"]
+        noise = noise_sigmas * (current["stdev"] ** 2 + previous["stdev"] ** 2) ** 0.5
+        threshold = max(tolerance * previous["median"], noise)
+        if delta > threshold:
+            verdict = "regression"
+        elif delta < -threshold:
+            verdict = "improvement"
+        else:
+            verdict = "unchanged"
+        comparisons.append({
+            "stage": stage,
+            "baseline": previous["median"],
+            "current": current["median"],
+            "change": delta / previous["median"] if previous["median"] else 0.0,
+            "verdict": verdict,
+        })
+    return comparisons
+
+def print_results(results):
+    print(f"{'stage':<45} {'median (s)':>11} {'stdev (s)':>10} {'min (s)':>10}")
+    for stage, timing in results.items():
+        print(f"{stage:<45} {timing['median']:>11.4f} {timing['stdev']:>10.4f} {timing['min']:>10.4f}")
+
+def print_comparison(comparisons):
+    print(f"{'stage':<45} {'baseline':>9} {'current':>9} {'change':>8}  verdict")
+    for row in comparisons:
+        print(f"{row['stage']:<45} {row['baseline']:>9.4f} {row['current']:>9.4f} "
+              f"{row['change']:>+7.1%}  {row['verdict']}")
@@ -0,0 +1,142 @@
+"""
+Stage-by-stage benchmark of the PDF analysis pipeline on synthetic PDFs.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --save-baseline main
+    python -m benchmarks.run_benchmarks --compare main --fail-on-regression
+
+Models are stubbed by default (see benchmarks/stubs.py); pass --real-models to
+time the actual Hugging Face models instead.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+from benchmarks.fixtures import SCENARIOS, make_synthetic_pdf, make_sentences
+from benchmarks.harness import (
+    compare_to_baseline, load_baseline, print_comparison, print_results, save_baseline, time_stage,
+)
+
+def quiet(fn):
+    """
+    Wraps `fn` so the pipeline's progress prints don't flood the benchmark output.
+    """
+    def wrapper(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def fresh_dir(workdir):
+    # `process_scholarly_pdf` only creates its sub-folders when the output folder is new
+    return os.path.join(tempfile.mkdtemp(dir=workdir), "out")
+
+def run_scenario(name, params, workdir, warmup, repeat):
+    """
+    Generates the scenario's PDF and times every pipeline stage on it.
+    """
+    from src.process_pdf import process_scholarly_pdf
+    from src.figure_extractor import extract_figures, iter_figures
+    from src.figure_triage import FigureTriage, print_triage_report
+    from src.analysis_job import analyze_figures
+    from src.visual_analyzer import categorize_figure, estimate_complexity, extract_keywords, is_table, parse_table
+    from src.text_analyzer import calculate_burstiness, calculate_perplexity
+    from src.model_detector import predict_text_class
+    from src.image_authenticity import check_image_authenticity
+    from src.fact_checker import extract_claim, verify_claim
+
+    pdf_path = make_synthetic_pdf(os.path.join(workdir, f"{name}.pdf"), **params)
+    results = {}
+
+    def stage(label, fn, *args):
+        results[f"{name}/{label}"] = time_stage(quiet(fn), *args, warmup=warmup, repeat=repeat)
+
+    # Prepare the inputs the downstream stages consume, outside the timed region
+    processed_dir = fresh_dir(workdir)
+    quiet(process_scholarly_pdf)(pdf_path, processed_dir)
+    with open(os.path.join(processed_dir, "full_text.txt"), "r", encoding="utf-8") as f:
+        text = " ".join(f.read().split()[:500])
+    figures = quiet(extract_figures)(pdf_path, fresh_dir(workdir))
+    tables = [data for data in figures if is_table(data["image_path"])]
+
+    stage("process_pdf", lambda: process_scholarly_pdf(pdf_path, fresh_dir(workdir)))
+    stage("extract_figures", lambda: extract_figures(pdf_path, fresh_dir(workdir)))
+
+    # Extraction plus figure analysis, without and with the triage pre-filter.
+    # Each triaged run starts from an empty index so only in-document duplicates count.
+    def analyze_all(triage=None):
+        return list(analyze_figures(iter_figures(pdf_path, fresh_dir(workdir), triage), triage))
+
+    stage("analyze_figures", analyze_all)
+    stage("analyze_figures.triaged", lambda: analyze_all(FigureTriage()))
+    triage = FigureTriage()
+    quiet(analyze_all)(triage)
+    print_triage_report(triage.report())
+
+    stage("visual.is_table", lambda: [is_table(d["image_path"]) for d in figures])
+    stage("visual.categorize_figure", lambda: [categorize_figure(d["image_path"], d["ocr_text"]) for d in figures])
+    stage("visual.estimate_complexity", lambda: [estimate_complexity(d["image_path"], d["ocr_text"]) for d in figures])
+    stage("visual.extract_keywords", lambda: [extract_keywords(d["caption"]) for d in figures])
+    if tables:
+        stage("visual.parse_table", lambda: [parse_table(d["image_path"]) for d in tables])
+
+    stage("text.perplexity", calculate_perplexity, text)
+    stage("text.burstiness", calculate_burstiness, text)
+
+    evidence = make_sentences(random.Random(1), 8)
+    stage("detector.text_class", predict_text_class, text)
+    stage("detector.image_authenticity", lambda: [check_image_authenticity(d["image_path"]) for d in figures])
+    stage("detector.fact_check", lambda: verify_claim(extract_claim(text), evidence))
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--warmup", type=int, default=1, help="untimed calls before each stage")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions per stage")
+    parser.add_argument("--real-models", action="store_true", help="use the real models instead of stubs")
+    parser.add_argument("--save-baseline", metavar="NAME", help="save results to benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare results against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="relative change ignored when comparing")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit non-zero if a stage regressed")
+    args = parser.parse_args(argv)
+
+    if not args.real_models:
+        from benchmarks.stubs import install_model_stubs
+        install_model_stubs()
+
+    workdir = tempfile.mkdtemp(prefix="pdf_bench_")
+    results = {}
+    try:
+        for name in args.scenarios:
+            print(f"Running scenario '{name}'...")
+            results.update(run_scenario(name, SCENARIOS[name], workdir, args.warmup, args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print_results(results)
+
+    if args.save_baseline:
+        path = save_baseline(results, args.save_baseline, {"stub_models": not args.real_models})
+        print(f"\nBaseline saved to '{path}'")
+
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if baseline is None:
+            print(f"\nError: no baseline named '{args.compare}'")
+            return 2
+        comparisons = compare_to_baseline(results, baseline, tolerance=args.tolerance)
+        print()
+        print_comparison(comparisons)
+        if args.fail_on_regression and any(row["verdict"] == "regression" for row in comparisons):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
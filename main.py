@@ -3,10 +3,33 @@ from src.process_pdf import process_scholarly_pdf
 from src.text_analyzer import calculate_perplexity, calculate_burstiness
 from src.model_detector import predict_text_class
 from src.fact_checker import extract_claim, retrieve_evidence, verify_claim
+from src.detection_cascade import DetectionCascade
+from src.resource_governor import configure, print_utilization_report
 
-def analyze_document(pdf_path):
+CASCADE_CALIBRATION_PATH = "cascade_calibration.json"
+
+def run_fact_check(text_to_analyze):
+    claim = extract_claim(text_to_analyze)
+    if claim:
+        print(f"-> Extracted Claim for Fact-Checking: '{claim}'")
+        evidence, url = retrieve_evidence(claim)
+        if evidence:
+            most_similar, sim_score = verify_claim(claim, evidence)
+            print(f"-> Similarity to Evidence: {sim_score:.2f}")
+            print(f"-> Most Relevant Fact: '{most_similar.strip()}'")
+            print(f"-> Source: {url}")
+        else:
+            print("-> Could not find evidence for the claim.")
+    else:
+        print("-> No claim extracted.")
+
+def analyze_document(pdf_path, cascade=None):
     """
     Runs a full analysis on a given PDF document.
+
+    With a `DetectionCascade`, the cheap signals run first and RoBERTa detection
+    and fact-checking only run when they are inconclusive. Returns the cascade's
+    result in that case.
     """
     if not os.path.exists(pdf_path):
         print(f"Error: File not found at {pdf_path}")
@@ -26,6 +49,25 @@ def analyze_document(pdf_path):
     # Analyze only the first 500 words for efficiency
     text_to_analyze = " ".join(full_text.split()[:500])
 
+    if cascade is not None:
+        print("\n[1] Detection Cascade:")
+        result = cascade.classify(text_to_analyze)
+        if "perplexity" in result["features"]:
+            print(f"-> Perplexity Score (first {cascade.perplexity_tokens} tokens): {result['features']['perplexity']:.2f}")
+        if "burstiness" in result["features"]:
+            print(f"-> Burstiness Score: {result['features']['burstiness']:.2f}")
+        print(f"-> Predicted Class: '{result['label']}' (Confidence: {result['score']:.2f}, "
+              f"decided by: {result['exit_stage']})")
+
+        if result["escalated"]:
+            print("\n[2] Fact-Checking Prototype:")
+            run_fact_check(text_to_analyze)
+        else:
+            print("-> Cheap signals were conclusive; skipped RoBERTa detection and fact-checking.")
+
+        print("\n--- Analysis Complete ---")
+        return result
+
     print("\n[1] Statistical Analysis:")
     perplexity = calculate_perplexity(text_to_analyze)
     burstiness = calculate_burstiness(text_to_analyze)
@@ -37,19 +79,7 @@ def analyze_document(pdf_path):
     print(f"-> Predicted Class: '{label}' (Confidence: {score:.2f})")
     
     print("\n[3] Fact-Checking Prototype:")
-    claim = extract_claim(text_to_analyze)
-    if claim:
-        print(f"-> Extracted Claim for Fact-Checking: '{claim}'")
-        evidence, url = retrieve_evidence(claim)
-        if evidence:
-            most_similar, sim_score = verify_claim(claim, evidence)
-            print(f"-> Similarity to Evidence: {sim_score:.2f}")
-            print(f"-> Most Relevant Fact: '{most_similar.strip()}'")
-            print(f"-> Source: {url}")
-        else:
-            print("-> Could not find evidence for the claim.")
-    else:
-        print("-> No claim extracted.")
+    run_fact_check(text_to_analyze)
     
     print("\n--- Analysis Complete ---")
 
@@ -58,4 +88,13 @@ if __name__ == "__main__":
     # Replace this with the path to a PDF you downloaded
     # Try one human-written paper and one paper where you replaced the abstract with AI text
     sample_pdf_path = "The Role of Artificial Intelligence in Everyday Life.pdf"
-    analyze_document(sample_pdf_path)
\ No newline at end of file
+    configure()
+
+    # Calibrate with `python -m src.detection_cascade` to enable early exits
+    cascade = None
+    if os.path.exists(CASCADE_CALIBRATION_PATH):
+        cascade = DetectionCascade.from_file(CASCADE_CALIBRATION_PATH)
+
+    analyze_document(sample_pdf_path, cascade)
+    print("\n[4] Resource Utilization:")
+    print_utilization_report()
@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from .figure_extractor import count_embedded_images, iter_figures, make_thumbnail
+from .visual_analyzer import categorize_figure, extract_keywords, estimate_complexity, parse_table
+from .image_authenticity import check_image_authenticity
+
+def analyze_figure(data):
+    """
+    Runs metadata enrichment, complexity scoring, the authenticity check and
+    table parsing on one extracted figure. Updates and returns `data`.
+    """
+    image_path = data["image_path"]
+    ocr_text = data["ocr_text"]
+    caption = data["caption"]
+
+    # Run metadata enrichment and complexity scoring
+    data["category"] = categorize_figure(image_path, ocr_text)
+    data["keywords"] = extract_keywords(caption)
+    data["complexity_score"] = estimate_complexity(image_path, ocr_text)
+
+    # Run authenticity check
+    auth_label, auth_score = check_image_authenticity(image_path)
+    data["authenticity_label"] = auth_label
+    data["authenticity_score"] = auth_score
+
+    # If it's a table, try to parse it
+    if data["category"] == "table":
+        data["table_data"] = parse_table(image_path)
+    else:
+        data["table_data"] = None
+
+    return data
+
+
+def analyze_figures(figures, triage=None):
+    """
+    Analyzes figures from `iter_figures` one at a time, yielding each when done.
+
+    Figures reused from a near-duplicate only need keywords for their own caption.
+    Fully analyzed figures are added to the triage index, so consume this lazily
+    to let later duplicates in the same document reuse earlier results.
+    """
+    for data in figures:
+        if "reused_from" in data:
+            data["keywords"] = extract_keywords(data["caption"])
+        else:
+            started = time.perf_counter()
+            analyze_figure(data)
+            if triage is not None:
+                triage.add_seconds(time.perf_counter() - started)
+                triage.remember(data)
+        yield data
+
+
+class AnalysisJob:
+    """
+    Runs the figure pipeline on a background thread and publishes each figure's
+    results as soon as it is finished, so a UI can render them progressively.
+
+    The worker never calls Streamlit; readers poll `snapshot()` instead.
+
+    Without an `output_dir`, figures are written to a private temporary folder
+    that is deleted when the job finishes, so concurrent or restarted jobs can't
+    read each other's images. Results keep their thumbnails, not the files.
+
+    `source_name` names the document in each figure's "source", for PDFs saved
+    under a temporary path (see `iter_figures`).
+    """
+
+    def __init__(self, pdf_path, output_dir=None, thumbnail_size=(480, 480), delete_pdf=False,
+                 triage=None, source_name=None):
+        self.pdf_path = pdf_path
+        self.source_name = source_name
+        self.triage = triage
+        self.output_dir = output_dir
+        self._owns_output_dir = output_dir is None
+        self.thumbnail_size = thumbnail_size
+        self.delete_pdf = delete_pdf
+
+        self._results = []
+        self._total = None
+        self._done = False
+        self._error = None
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="analysis-job", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Asks the worker to stop after the figure it is currently analyzing."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self):
+        with self._lock:
+            return self._done
+
+    def snapshot(self):
+        """
+        Returns a consistent view of the job: (results, total, done, error).
+        `total` is None until the images in the PDF have been counted.
+        """
+        with self._lock:
+            return list(self._results), self._total, self._done, self._error
+
+    def _run(self):
+        try:
+            self._analyze()
+        finally:
+            # Always reached, so a failed clean-up can't leave the UI polling forever
+            with self._lock:
+                self._done = True
+
+    def _analyze(self):
+        figures = None
+        try:
+            total = count_embedded_images(self.pdf_path)
+            with self._lock:
+                self._total = total
+
+            if self._owns_output_dir:
+                self.output_dir = tempfile.mkdtemp(prefix="analysis_job_")
+            figures = iter_figures(self.pdf_path, self.output_dir, self.triage, source_name=self.source_name)
+            for data in analyze_figures(figures, self.triage):
+                data["thumbnail"] = make_thumbnail(data["image_path"], self.thumbnail_size)
+                with self._lock:
+                    self._results.append(data)
+                if self.cancelled:
+                    break
+        except Exception as e:
+            self._record_error(str(e))
+        finally:
+            self._clean_up(figures)
+
+    def _clean_up(self, figures):
+        # Each step runs even if an earlier one fails; failures are reported, not raised
+        steps = []
+        if figures is not None:
+            steps.append(("closing the PDF", figures.close))
+        if self._owns_output_dir and self.output_dir:
+            steps.append(("deleting the figure folder", lambda: shutil.rmtree(self.output_dir)))
+        if self.triage is not None:
+            steps.append(("saving the figure index", self.triage.save))
+        if self.delete_pdf:
+            steps.append(("deleting the temporary PDF", self._delete_pdf))
+        for description, step in steps:
+            try:
+                step()
+            except Exception as e:
+                self._record_error(f"Failed {description}: {e}")
+
+    def _delete_pdf(self):
+        if os.path.exists(self.pdf_path):
+            os.remove(self.pdf_path)
+
+    def _record_error(self, message):
+        with self._lock:
+            self._error = f"{self._error}; {message}" if self._error else message
@@ -0,0 +1,212 @@
+import json
+import math
+import os
+import time
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+from .text_analyzer import calculate_burstiness, calculate_perplexity
+from .model_detector import predict_text_class
+
+# Tokens scored by the cheap perplexity stage (the full analysis scores ~500 words)
+CHEAP_PERPLEXITY_TOKENS = 128
+
+# Early exits must be at least this accurate on the labeled calibration set
+TARGET_EXIT_ACCURACY = 0.95
+
+# Fewest calibration documents allowed to justify an exit threshold
+MIN_EXIT_SUPPORT = 5
+
+# Cross-validation folds used to score calibration documents out of sample
+CALIBRATION_FOLDS = 5
+
+AI_LABELS = {"ai", "ai-generated", "fake", "1"}
+
+# Cheap stages in the order they run, with the features each one adds
+CHEAP_STAGES = ("burstiness", "perplexity")
+
+
+def _cheap_features(text, perplexity_tokens, stage, cache):
+    """
+    Returns the feature vector for `stage`, computing (and caching) only what is missing.
+    """
+    if "burstiness" not in cache:
+        cache["burstiness"] = float(calculate_burstiness(text))
+    if stage == "burstiness":
+        return [cache["burstiness"]]
+    if "perplexity" not in cache:
+        cache["perplexity"] = float(calculate_perplexity(text, max_tokens=perplexity_tokens))
+    return [cache["burstiness"], math.log(max(cache["perplexity"], 1.0))]
+
+def _fit_band(scores, labels, target=TARGET_EXIT_ACCURACY, min_support=MIN_EXIT_SUPPORT):
+    """
+    Picks the widest exits, from each end of the score range, that stay at least
+    `target` accurate on the calibration set. Scores between the two thresholds
+    are the uncertainty band that goes on to the next stage.
+
+    Returns:
+        list: [low, high]. Below `low` exits as Human, above `high` as AI-Generated.
+    """
+    order = np.argsort(scores)
+    sorted_scores, sorted_labels = np.asarray(scores)[order], np.asarray(labels)[order]
+    count = len(sorted_scores)
+
+    low = 0.0
+    for i in range(min_support, count + 1):
+        if (sorted_labels[:i] == 0).mean() >= target and i < count:
+            low = float((sorted_scores[i - 1] + sorted_scores[i]) / 2)
+
+    high = 1.0
+    for i in range(min_support, count + 1):
+        if (sorted_labels[count - i:] == 1).mean() >= target and i < count:
+            high = float((sorted_scores[count - i - 1] + sorted_scores[count - i]) / 2)
+
+    return [low, max(low, high)]
+
+def _out_of_fold_scores(features, labels, folds=CALIBRATION_FOLDS):
+    """
+    Scores each document with a model fitted on the other folds, so the exit
+    thresholds are chosen on scores the model did not train on.
+
+    Returns:
+        numpy.ndarray or None: AI probabilities, or None when a class has fewer
+                               than two documents to split.
+    """
+    folds = min(folds, int(np.bincount(labels, minlength=2).min()))
+    if folds < 2:
+        return None
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    return cross_val_predict(LogisticRegression(), features, labels, cv=splitter, method="predict_proba")[:, 1]
+
+def load_labeled_set(path):
+    """
+    Reads a JSONL file of {"text": ..., "label": "Human" | "AI-Generated"} lines.
+
+    Returns:
+        tuple: (texts, labels) with labels as 1 for AI-generated and 0 for human.
+    """
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            texts.append(record["text"])
+            labels.append(1 if str(record["label"]).strip().lower() in AI_LABELS else 0)
+    return texts, labels
+
+
+class DetectionCascade:
+    """
+    Runs the cheap detectors first and the expensive ones only when needed.
+
+    Stage 1 scores burstiness, stage 2 adds GPT-2 perplexity over a truncated
+    context. Each stage's logistic score exits early when it falls outside the
+    stage's calibrated uncertainty band; otherwise the RoBERTa detector decides.
+    Without a calibration every document goes to RoBERTa.
+    """
+
+    def __init__(self, calibration=None):
+        self.calibration = calibration
+        self.perplexity_tokens = (calibration or {}).get("perplexity_tokens", CHEAP_PERPLEXITY_TOKENS)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.calibration, f, indent=2)
+
+    @classmethod
+    def calibrate(cls, texts, labels, perplexity_tokens=CHEAP_PERPLEXITY_TOKENS, target=TARGET_EXIT_ACCURACY):
+        """
+        Fits each cheap stage's score and uncertainty band on a labeled set.
+
+        Each stage is fitted only on the documents the earlier stages left in
+        their uncertainty band, since those are the only ones it will see, and
+        its band is picked on cross-validated scores. A stage with too few
+        ambiguous documents of both labels is left out.
+        """
+        labels = np.asarray(labels)
+        caches = [{} for _ in texts]
+        remaining = np.arange(len(texts))
+        stages = []
+        for stage in CHEAP_STAGES:
+            if len(remaining) < 2 * MIN_EXIT_SUPPORT:
+                break
+            stage_labels = labels[remaining]
+            features = np.array([
+                _cheap_features(texts[i], perplexity_tokens, stage, caches[i]) for i in remaining
+            ])
+            scores = _out_of_fold_scores(features, stage_labels)
+            if scores is None:
+                break
+            model = LogisticRegression().fit(features, stage_labels)
+            low, high = _fit_band(scores, stage_labels, target)
+            stages.append({
+                "name": stage,
+                "coef": model.coef_[0].tolist(),
+                "intercept": float(model.intercept_[0]),
+                "band": [low, high],
+                "calibration_documents": len(remaining),
+            })
+            remaining = remaining[(scores >= low) & (scores <= high)]
+        return cls({"perplexity_tokens": perplexity_tokens, "target_accuracy": target, "stages": stages})
+
+    def classify(self, text):
+        """
+        Classifies `text`, stopping at the first stage that is confident enough.
+
+        Returns:
+            dict: label, score (confidence in that label), exit_stage, the cheap
+                  features computed and per-stage seconds.
+        """
+        cache, timings = {}, {}
+        for stage in (self.calibration or {}).get("stages", []):
+            started = time.perf_counter()
+            features = _cheap_features(text, self.perplexity_tokens, stage["name"], cache)
+            timings[stage["name"]] = time.perf_counter() - started
+
+            ai_probability = 1 / (1 + math.exp(-(np.dot(stage["coef"], features) + stage["intercept"])))
+            low, high = stage["band"]
+            if ai_probability < low:
+                return self._result("Human", 1 - ai_probability, stage["name"], cache, timings)
+            if ai_probability > high:
+                return self._result("AI-Generated", ai_probability, stage["name"], cache, timings)
+
+        started = time.perf_counter()
+        label, score = predict_text_class(text)
+        timings["roberta"] = time.perf_counter() - started
+        return self._result(label, score, "roberta", cache, timings)
+
+    @staticmethod
+    def _result(label, score, exit_stage, features, timings):
+        return {
+            "label": label,
+            "score": score,
+            "exit_stage": exit_stage,
+            "escalated": exit_stage == "roberta",
+            "features": dict(features),
+            "timings": timings,
+        }
+
+# --- Example Usage: calibrate from a labeled JSONL file ---
+if __name__ == "__main__":
+    labeled_path = "labeled_texts.jsonl"
+    calibration_path = "cascade_calibration.json"
+
+    if os.path.exists(labeled_path):
+        texts, labels = load_labeled_set(labeled_path)
+        texts = [" ".join(text.split()[:500]) for text in texts]
+        cascade = DetectionCascade.calibrate(texts, labels)
+        cascade.save(calibration_path)
+        for stage in cascade.calibration["stages"]:
+            print(f"{stage['name']}: uncertainty band {stage['band'][0]:.2f} - {stage['band'][1]:.2f}")
+        print(f"Calibration saved to '{calibration_path}'")
+    else:
+        print(f"Error: The labeled set '{labeled_path}' was not found.")
+        print('Create a JSONL file with one {"text": ..., "label": "Human" | "AI-Generated"} object per line.')
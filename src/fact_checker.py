@@ -1,8 +1,20 @@
 import wikipediaapi
 from sentence_transformers import SentenceTransformer, util
 import torch
-# Load a model for calculating sentence similarity
-similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
+
+from .resource_governor import governed_stage
+
+# Model for calculating sentence similarity, loaded on first use
+similarity_model = None
+
+def load_similarity_model():
+    """
+    Returns the sentence-similarity model, loading it on the first call.
+    """
+    global similarity_model
+    if similarity_model is None:
+        similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
+    return similarity_model
 
 # Setup Wikipedia API
 wiki_wiki = wikipediaapi.Wikipedia(
@@ -40,8 +52,10 @@ def verify_claim(claim, evidence):
     evidence_sentences = evidence.split('. ')
     
     # Encode claim and evidence sentences into vectors
-    claim_embedding = similarity_model.encode(claim, convert_to_tensor=True)
-    evidence_embeddings = similarity_model.encode(evidence_sentences, convert_to_tensor=True)
+    similarity_model = load_similarity_model()
+    with governed_stage("similarity"):
+        claim_embedding = similarity_model.encode(claim, convert_to_tensor=True)
+        evidence_embeddings = similarity_model.encode(evidence_sentences, convert_to_tensor=True)
     
     # Compute cosine similarities
     cosine_scores = util.cos_sim(claim_embedding, evidence_embeddings)
@@ -1,18 +1,27 @@
 import fitz  # PyMuPDF
+import hashlib
 import os
 import io
 import pytesseract
 import re
+import time
 from PIL import Image
 
-def ocr_text_from_image(image_path):
+from .image_decoding import ImageDecoder
+from .resource_governor import governed_stage
+
+def ocr_text_from_image(image_path, raise_errors=False):
     """
     Performs OCR on a single image file to extract embedded text.
+    Errors are printed and give "" unless `raise_errors` is set.
     """
     try:
-        text = pytesseract.image_to_string(Image.open(image_path))
+        with governed_stage("ocr"):
+            text = pytesseract.image_to_string(Image.open(image_path))
         return text.strip()
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Error during OCR for {image_path}: {e}")
         return ""
 
@@ -41,52 +50,171 @@ def find_caption_for_image(page, img_bbox):
     return caption.replace("\n", " ")
 
 
-def extract_figures(pdf_path, output_dir="figures_output"):
+def count_embedded_images(pdf_path):
     """
-    Extracts figures, their captions, and performs OCR on each figure.
+    Counts the embedded images in a PDF without decoding them.
+    """
+    with fitz.open(pdf_path) as doc:
+        return sum(len(page.get_images(full=True)) for page in doc)
+
+
+def image_content_hash(doc, xref):
+    """
+    Hashes an embedded image's raw (still compressed) stream, so the same image
+    can be recognized in another version of the document whatever its xref.
+    """
+    return hashlib.sha256(doc.xref_stream_raw(xref) or b"").hexdigest()
+
+
+def iter_figures(pdf_path, output_dir="figures_output", triage=None, decoder=None,
+                 pages=None, known_figures=None, source_name=None):
+    """
+    Yields each figure (path, OCR text, caption and page) as soon as it is extracted.
+
+    With a `FigureTriage`, junk images are dropped before decoding or OCR, and
+    near-duplicates of earlier figures are yielded with those figures' results
+    already filled in (marked by a "reused_from" key).
+
+    Oversized images are decoded at reduced resolution by `decoder` (a default
+    `ImageDecoder` if None), so one huge scan can't exhaust the worker's memory.
+
+    `pages` limits extraction to those 0-based page numbers. `known_figures` maps
+    `image_content_hash` values to results from an earlier run; matching images
+    are yielded with those results (marked by "reused_from") without being
+    decoded, and every figure gets a "content_hash" key.
+
+    Every figure has a "source" key naming the PDF and page it came from; for
+    reused figures "reused_from" is the source of the figure reused. The PDF is
+    named by `source_name` when given, e.g. the original name of an upload saved
+    under a temporary path, and by the file name of `pdf_path` otherwise.
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
+    if decoder is None:
+        decoder = ImageDecoder()
 
     doc = fitz.open(pdf_path)
-    extracted_data = []
+    pdf_name = source_name or os.path.basename(pdf_path)
     figure_count = 0
 
-    for page_num, page in enumerate(doc):
-        image_list = page.get_images(full=True)
+    try:
+        for page_num, page in enumerate(doc):
+            if pages is not None and page_num not in pages:
+                continue
+            image_list = page.get_images(full=True)
 
-        for img_index, img in enumerate(image_list):
-            xref = img[0]
-            
-            # Get the image's bounding box on the page
-            img_bbox = page.get_image_bbox(img)
+            for img_index, img in enumerate(image_list):
+                xref = img[0]
+                
+                # Get the image's bounding box on the page
+                img_bbox = page.get_image_bbox(img)
 
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
+                if triage is not None:
+                    rule = triage.check_metadata(img, img_bbox, page.rect)
+                    if rule:
+                        triage.record_skip(rule)
+                        continue
 
-            try:
-                image = Image.open(io.BytesIO(image_bytes))
-                figure_count += 1
-                figure_filename = f"figure_{figure_count}_p{page_num + 1}.png"
-                save_path = os.path.join(output_dir, figure_filename)
-                
-                image.save(open(save_path, "wb"), "PNG")
+                content_hash = None
+                if known_figures is not None:
+                    content_hash = image_content_hash(doc, xref)
+                    known = known_figures.get(content_hash)
+                    if known is not None and os.path.exists(known["image_path"]):
+                        data = dict(known)
+                        data["reused_from"] = known.get("source") or known["image_path"]
+                        data["source"] = f"{pdf_name}, page {page_num + 1}"
+                        data["caption"] = find_caption_for_image(page, img_bbox)
+                        data["page"] = page_num + 1
+                        yield data
+                        continue
 
-                ocr_text = ocr_text_from_image(save_path)
-                caption_text = find_caption_for_image(page, img_bbox)
-                
-                extracted_data.append({
+                try:
+                    image = decoder.decode(doc, page, img, img_bbox)
+
+                    image_hash, reused = None, None
+                    if triage is not None:
+                        rule, image_hash = triage.check_image(image)
+                        if rule:
+                            triage.record_skip(rule)
+                            continue
+                        reused = triage.find_duplicate(image_hash, image.width / image.height)
+
+                    started = time.perf_counter()
+                    figure_count += 1
+                    figure_filename = f"figure_{figure_count}_p{page_num + 1}.png"
+                    save_path = os.path.join(output_dir, figure_filename)
+                    
+                    image.save(open(save_path, "wb"), "PNG")
+
+                    caption_text = find_caption_for_image(page, img_bbox)
+                    ocr_failed = False
+                    if reused is None:
+                        try:
+                            ocr_text = ocr_text_from_image(save_path, raise_errors=True)
+                        except Exception as e:
+                            print(f"Error during OCR for {save_path}: {e}")
+                            ocr_text, ocr_failed = "", True
+                except Exception as e:
+                    print(f"Warning: Could not process image on page {page_num + 1}. Error: {e}")
+                    continue
+
+                if reused is not None:
+                    triage.record_reuse()
+                    data = reused
+                    # Entries written before "source" existed only have the old file path
+                    data["reused_from"] = data.pop("source", None) or data.pop("image_path", None)
+                    data["source"] = f"{pdf_name}, page {page_num + 1}"
+                    data["image_path"] = save_path
+                    data["caption"] = caption_text
+                    data["page"] = page_num + 1
+                    if content_hash is not None:
+                        data["content_hash"] = content_hash
+                    yield data
+                    continue
+
+                data = {
                     "image_path": save_path,
                     "ocr_text": ocr_text,
-                    "caption": caption_text
-                })
-            except Exception as e:
-                print(f"Warning: Could not process image on page {page_num + 1}. Error: {e}")
+                    "caption": caption_text,
+                    "page": page_num + 1,
+                    "source": f"{pdf_name}, page {page_num + 1}"
+                }
+                if ocr_failed:
+                    # Keeps the empty OCR text out of the near-duplicate index
+                    data["ocr_failed"] = True
+                if content_hash is not None:
+                    data["content_hash"] = content_hash
+                if triage is not None:
+                    triage.record_analysis(time.perf_counter() - started)
+                    data["image_hash"] = image_hash
+                    data["aspect"] = image.width / image.height
+                yield data
+    finally:
+        # Also runs when the caller stops iterating early (e.g. a cancelled job)
+        doc.close()
 
-    doc.close()
+
+def extract_figures(pdf_path, output_dir="figures_output", triage=None, decoder=None, source_name=None):
+    """
+    Extracts figures, their captions, and performs OCR on each figure.
+    """
+    extracted_data = list(iter_figures(pdf_path, output_dir, triage, decoder, source_name=source_name))
     print(f"Successfully extracted {len(extracted_data)} figures and their captions.")
     return extracted_data
 
+
+def make_thumbnail(image_path, max_size=(480, 480)):
+    """
+    Returns a downscaled PNG of the figure as bytes, for display in the browser.
+    """
+    with Image.open(image_path) as image:
+        image.thumbnail(max_size)
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
 # --- Example Usage for testing this module directly ---
 if __name__ == "__main__":
     sample_pdf_path = "path_to_your_sample_paper.pdf"
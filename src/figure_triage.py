@@ -0,0 +1,262 @@
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+from PIL import Image
+
+# Rules applied from image metadata alone, before the image is decoded
+MIN_SIDE_PX = 32            # spacers, bullets and icons
+MIN_PAGE_FRACTION = 0.01    # logos and badges drawn at a tiny size on the page
+MIN_STRIP_PT = 24           # rules, separators and inline equation bitmaps
+
+# Rules applied to the decoded image
+MIN_ENTROPY_BITS = 0.5      # blank or single-colour images
+
+# Near-duplicate detection with a 256-bit difference hash
+HASH_SIZE = 16
+MAX_HASH_DISTANCE = 10
+MAX_ASPECT_DIFFERENCE = 0.05
+
+# Results copied from an earlier figure when a near-duplicate is found.
+# Keywords are not reused because they come from the figure's own caption.
+REUSED_FIELDS = (
+    "ocr_text", "category", "complexity_score",
+    "authenticity_label", "authenticity_score", "table_data",
+)
+
+def difference_hash(image, hash_size=HASH_SIZE):
+    """
+    Computes a perceptual difference hash: each bit says whether a pixel is
+    brighter than its right-hand neighbour in a tiny grayscale copy.
+
+    Returns:
+        int: A hash_size * hash_size bit integer.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+def hamming_distance(hash_a, hash_b):
+    return (hash_a ^ hash_b).bit_count()
+
+
+class FigureIndex:
+    """
+    Perceptual hashes and results of analyzed figures, for near-duplicate reuse.
+
+    One instance can be shared by every run in a process; all methods are
+    thread-safe. With `index_path` the entries persist across documents.
+
+    The index also keeps the total time spent on analyzed figures, so a run
+    that analyzes nothing itself can still estimate the time its skips saved.
+    """
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._entries = []
+        self._keys = set()
+        # [seconds, figures] as last read from disk, and added since then
+        entries, self._saved_cost = self._read_file()
+        self._new_cost = [0.0, 0]
+        self._add_entries(entries)
+
+    def _read_file(self):
+        # A missing or unreadable index just means nothing has been seen yet
+        if not self.index_path or not os.path.exists(self.index_path):
+            return [], [0.0, 0]
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            entries = [
+                {"hash": int(entry["hash"], 16), "aspect": float(entry["aspect"]), "results": entry["results"]}
+                for entry in stored.get("entries", [])
+            ]
+            cost = stored.get("cost", {})
+            return entries, [float(cost.get("seconds", 0.0)), int(cost.get("figures", 0))]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Warning: Ignoring unreadable figure index '{self.index_path}'. Error: {e}")
+            return [], [0.0, 0]
+
+    def _add_entries(self, entries):
+        for entry in entries:
+            key = (entry["hash"], entry["results"].get("source"))
+            if key not in self._keys:
+                self._keys.add(key)
+                self._entries.append(entry)
+
+    def find_duplicate(self, image_hash, aspect):
+        """
+        Returns the stored results of the closest earlier near-duplicate, or None.
+        """
+        best, best_distance = None, MAX_HASH_DISTANCE + 1
+        with self._lock:
+            for entry in self._entries:
+                if abs(entry["aspect"] - aspect) > MAX_ASPECT_DIFFERENCE * max(aspect, entry["aspect"]):
+                    continue
+                distance = hamming_distance(entry["hash"], image_hash)
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+        return dict(best["results"]) if best else None
+
+    def add_cost(self, seconds, figures=0):
+        """Adds time spent extracting or analyzing figures, and how many were analyzed."""
+        with self._lock:
+            self._new_cost[0] += seconds
+            self._new_cost[1] += figures
+
+    def average_figure_seconds(self):
+        """Average time per analyzed figure over every run recorded in the index."""
+        with self._lock:
+            seconds = self._saved_cost[0] + self._new_cost[0]
+            figures = self._saved_cost[1] + self._new_cost[1]
+        return seconds / figures if figures else 0.0
+
+    def remember(self, data):
+        """
+        Adds an analyzed figure so later copies can reuse its results. Figures
+        whose analysis failed are left out, so the failure isn't copied onwards.
+        """
+        if data.get("image_hash") is None or data.get("ocr_failed"):
+            return
+        if str(data.get("authenticity_label", "")).startswith("Error"):
+            return
+        results = {field: data.get(field) for field in REUSED_FIELDS}
+        # Figure files are overwritten by later documents, so name the source instead
+        results["source"] = data.get("source")
+        with self._lock:
+            self._add_entries([{"hash": data["image_hash"], "aspect": data["aspect"], "results": results}])
+
+    def save(self):
+        """
+        Merges the entries with those already on disk (e.g. written by another
+        process) and writes the result atomically through a unique temp file.
+        """
+        if not self.index_path:
+            return
+        with self._lock:
+            stored_entries, stored_cost = self._read_file()
+            self._add_entries(stored_entries)
+            cost = [stored_cost[0] + self._new_cost[0], stored_cost[1] + self._new_cost[1]]
+            entries = [
+                {"hash": format(entry["hash"], "x"), "aspect": entry["aspect"], "results": entry["results"]}
+                for entry in self._entries
+            ]
+            directory = os.path.dirname(os.path.abspath(self.index_path))
+            fd, tmp_path = tempfile.mkstemp(prefix=".figure_index.", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "entries": entries,
+                               "cost": {"seconds": cost[0], "figures": cost[1]}}, f)
+                os.replace(tmp_path, self.index_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._saved_cost, self._new_cost = cost, [0.0, 0]
+
+
+class FigureTriage:
+    """
+    Cheap checks run before the heavy per-figure analysis of one run.
+
+    Junk images (spacers, icons, logos, rules, blank images) are dropped, and
+    near-duplicates of figures in `index` reuse those figures' results. Pass a
+    shared `FigureIndex` to recognize duplicates across documents; the counts
+    for the report are kept per `FigureTriage`.
+    """
+
+    def __init__(self, index=None):
+        self.index = index if index is not None else FigureIndex()
+        self._lock = threading.Lock()
+        self.skipped = {}
+        self.reused = 0
+        self.analyzed = 0
+        self.figure_seconds = 0.0
+
+    def check_metadata(self, img, img_bbox, page_rect):
+        """
+        Applies the rules that need only `page.get_images` info and the bbox.
+
+        Returns:
+            str or None: The name of the rule that rejects the image, if any.
+        """
+        width, height = img[2], img[3]
+        if min(width, height) < MIN_SIDE_PX:
+            return "too_small"
+        if img_bbox.is_empty or img_bbox.get_area() < MIN_PAGE_FRACTION * page_rect.get_area():
+            return "tiny_on_page"
+        if not img_bbox.is_infinite and min(img_bbox.width, img_bbox.height) < MIN_STRIP_PT:
+            return "thin_strip"
+        return None
+
+    def check_image(self, image):
+        """
+        Applies the blank check and computes the perceptual hash.
+
+        Returns:
+            tuple: (rejecting rule name or None, hash or None)
+        """
+        gray = image.convert("L")
+        gray.thumbnail((128, 128))
+        if gray.entropy() < MIN_ENTROPY_BITS:
+            return "blank", None
+        return None, difference_hash(gray)
+
+    def find_duplicate(self, image_hash, aspect):
+        return self.index.find_duplicate(image_hash, aspect)
+
+    def remember(self, data):
+        self.index.remember(data)
+
+    def save(self):
+        self.index.save()
+
+    def record_skip(self, rule):
+        with self._lock:
+            self.skipped[rule] = self.skipped.get(rule, 0) + 1
+
+    def record_reuse(self):
+        with self._lock:
+            self.reused += 1
+
+    def record_analysis(self, seconds):
+        """Counts a figure that goes on to full analysis, with its extraction time."""
+        with self._lock:
+            self.analyzed += 1
+            self.figure_seconds += seconds
+        self.index.add_cost(seconds, figures=1)
+
+    def add_seconds(self, seconds):
+        """Adds later analysis time spent on a figure already counted by `record_analysis`."""
+        with self._lock:
+            self.figure_seconds += seconds
+        self.index.add_cost(seconds)
+
+    def report(self):
+        """
+        Summarizes what was skipped and estimates the time saved, assuming each
+        skipped or reused figure would have cost the average analyzed figure.
+        When this run analyzed nothing, the index's average over earlier runs is used.
+        """
+        index_average = self.index.average_figure_seconds()
+        with self._lock:
+            skipped_total = sum(self.skipped.values())
+            average = self.figure_seconds / self.analyzed if self.analyzed else index_average
+            return {
+                "skipped": dict(self.skipped),
+                "reused": self.reused,
+                "analyzed": self.analyzed,
+                "average_figure_seconds": average,
+                "estimated_seconds_saved": (skipped_total + self.reused) * average,
+            }
+
+def print_triage_report(report):
+    print(f"Triage: {report['analyzed']} figures analyzed, {report['reused']} reused from near-duplicates.")
+    for rule, count in sorted(report["skipped"].items()):
+        print(f"-> Skipped by '{rule}': {count}")
+    print(f"-> Estimated time saved: {report['estimated_seconds_saved']:.1f}s "
+          f"({report['average_figure_seconds']:.2f}s per analyzed figure)")
@@ -2,13 +2,29 @@ from transformers import pipeline
 import os
 from PIL import Image
 
-# Initialize the image classification pipeline with a specialized model
+from .resource_governor import governed_stage
+
+# The image classification pipeline uses a specialized model and is loaded on
+# first use, so `image_detector` can be replaced with a stub before any call.
 # The first time this runs, it will download the model (a few hundred MB)
-try:
-    image_detector = pipeline("image-classification", model="umm-maybe/AI-image-detector")
-except Exception as e:
-    print(f"Could not load model. Make sure you have an internet connection. Error: {e}")
-    image_detector = None
+image_detector = None
+
+# Set after a failed load so later calls don't retry the download for every figure
+_load_failed = False
+
+def load_image_detector():
+    """
+    Returns the image-classification pipeline, or None if it could not be loaded.
+    Loading is attempted only once per process.
+    """
+    global image_detector, _load_failed
+    if image_detector is None and not _load_failed:
+        try:
+            image_detector = pipeline("image-classification", model="umm-maybe/AI-image-detector")
+        except Exception as e:
+            _load_failed = True
+            print(f"Could not load model. Make sure you have an internet connection. Error: {e}")
+    return image_detector
 
 def check_image_authenticity(image_path):
     """
@@ -21,7 +37,8 @@ def check_image_authenticity(image_path):
         tuple: A tuple containing the label ('Human-created' or 'AI-generated image')
                and the confidence score.
     """
-    if not image_detector:
+    detector = load_image_detector()
+    if not detector:
         return "Error: Model not loaded", 0.0
     if not os.path.exists(image_path):
         return "Error: File not found", 0.0
@@ -31,7 +48,8 @@ def check_image_authenticity(image_path):
         image = Image.open(image_path)
         
         # The pipeline returns a list of predictions
-        predictions = image_detector(image)
+        with governed_stage("image_detector"):
+            predictions = detector(image)
         
         # The top prediction is the first element
         top_prediction = predictions[0]
@@ -57,7 +75,7 @@ if __name__ == "__main__":
 
     print("--- AI Image Authenticity Check ---")
 
-    if image_detector:
+    if load_image_detector():
         # Test the real image
         if os.path.exists(sample_real_image_path):
             real_label, real_score = check_image_authenticity(sample_real_image_path)
@@ -0,0 +1,186 @@
+import io
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+# Longest side, in pixels, that any analyzer needs. OCR is the most demanding;
+# the OpenCV stages and the image classifier shrink their input much further.
+DEFAULT_MAX_SIDE = 3000
+
+# Largest decoded (uncompressed) size allowed for any single image. This is a
+# per-image cap, not a running total: `iter_figures` and `process_scholarly_pdf`
+# hold one decoded image at a time, which is what keeps a document's peak down.
+# `max_side` alone allows up to 3000x3000 CMYK (~36 MB), so this cap also
+# shrinks square RGB and CMYK images a little further.
+DEFAULT_MAX_IMAGE_MB = 24
+
+# Bytes per pixel after decoding, by PDF colour space name
+_CHANNELS = {"DeviceGray": 1, "DeviceCMYK": 4}
+
+def decoded_size_bytes(width, height, colorspace=""):
+    return width * height * _CHANNELS.get(colorspace, 3)
+
+
+class ImageDecoder:
+    """
+    Decodes embedded PDF images no larger than the analyzers need.
+
+    Images within `max_side` and `max_image_mb` are decoded as before. Larger
+    ones are not decoded at full resolution:
+
+    - JPEGs are decoded with PIL's DCT-domain `draft` scaling.
+    - Other images are drawn alone on a temporary page at the target size, and
+      MuPDF subsamples them while decompressing.
+    - Images drawn through a Form XObject can't be isolated that way. They are
+      rendered from their area on the original page, which also picks up any
+      text or drawings on top and is cut off at the page edge ("clip_renders").
+    - If that area is empty or infinite (the image isn't drawn on the page),
+      the image is decoded at full resolution and only then shrunk, so the
+      bound does not hold for it ("unbounded_decodes").
+
+    Pass None for either limit to disable it. The counters, `bytes_avoided` and
+    `peak_decoded_bytes` are summarized by `stats()`.
+    """
+
+    def __init__(self, max_side=DEFAULT_MAX_SIDE, max_image_mb=DEFAULT_MAX_IMAGE_MB):
+        self.max_side = max_side
+        self.max_image_bytes = max_image_mb * 1024 * 1024 if max_image_mb else None
+        self.reduced = 0
+        self.jpeg_drafts = 0
+        self.isolated_renders = 0
+        self.clip_renders = 0
+        self.unbounded_decodes = 0
+        self.bytes_avoided = 0
+        self.peak_decoded_bytes = 0
+
+    def target_size(self, width, height, colorspace=""):
+        """
+        Returns the largest (width, height) within both limits, keeping the aspect ratio.
+        """
+        scale = 1.0
+        if self.max_side and max(width, height) > self.max_side:
+            scale = self.max_side / max(width, height)
+        if self.max_image_bytes:
+            full_bytes = decoded_size_bytes(width, height, colorspace)
+            if full_bytes * scale * scale > self.max_image_bytes:
+                scale = (self.max_image_bytes / full_bytes) ** 0.5
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    def needs_reduction(self, img):
+        """
+        Tells from a `page.get_images(full=True)` entry, without decoding, whether
+        the image must be decoded at reduced resolution.
+        """
+        width, height, colorspace = img[2], img[3], img[5]
+        return self.target_size(width, height, colorspace) != (width, height)
+
+    def decode(self, doc, page, img, img_bbox=None):
+        """
+        Decodes the image at native resolution, or reduced if it exceeds the limits.
+
+        Args:
+            doc: The open PyMuPDF document.
+            page: The page the image is drawn on.
+            img: The image's entry from `page.get_images(full=True)`.
+            img_bbox: Its bounding box on the page, if already known.
+
+        Returns:
+            PIL.Image.Image: The decoded image.
+        """
+        xref, width, height, colorspace = img[0], img[2], img[3], img[5]
+        target = self.target_size(width, height, colorspace)
+
+        if target == (width, height):
+            image = self._decode_full(doc, xref)
+            self._record(image)
+            return image
+
+        image = None
+        if doc.xref_get_key(xref, "Filter")[1] == "/DCTDecode":
+            image = self._decode_jpeg_draft(doc, xref, target)
+            if image is not None:
+                self.jpeg_drafts += 1
+        if image is None:
+            image = self._render_isolated(doc, page, img, target)
+            if image is not None:
+                self.isolated_renders += 1
+        if image is None:
+            if img_bbox is None:
+                img_bbox = page.get_image_bbox(img)
+            if img_bbox.is_empty or img_bbox.is_infinite:
+                image = self._decode_full(doc, xref)
+                self.unbounded_decodes += 1
+            else:
+                image = self._render_clip(page, img_bbox, target)
+                self.clip_renders += 1
+
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGB")
+        image.thumbnail(target)
+        self.reduced += 1
+        self.bytes_avoided += decoded_size_bytes(width, height, colorspace) - decoded_size_bytes(
+            image.width, image.height, colorspace)
+        self._record(image)
+        return image
+
+    def stats(self):
+        """Returns the decoder's counters for reports and benchmarks."""
+        return {
+            "reduced": self.reduced,
+            "jpeg_drafts": self.jpeg_drafts,
+            "isolated_renders": self.isolated_renders,
+            "clip_renders": self.clip_renders,
+            "unbounded_decodes": self.unbounded_decodes,
+            "bytes_avoided": self.bytes_avoided,
+            "peak_decoded_bytes": self.peak_decoded_bytes,
+        }
+
+    def _decode_full(self, doc, xref):
+        image = Image.open(io.BytesIO(doc.extract_image(xref)["image"]))
+        image.load()
+        return image
+
+    def _decode_jpeg_draft(self, doc, xref, target):
+        # The raw stream of a DCTDecode image is a complete JPEG file;
+        # `draft` makes libjpeg decode it directly at 1/2, 1/4 or 1/8 scale.
+        try:
+            image = Image.open(io.BytesIO(doc.xref_stream_raw(xref)))
+            image.draft("L" if image.mode == "L" else "RGB", target)
+            image.load()
+            return image
+        except Exception:
+            return None
+
+    def _render_isolated(self, doc, page, img, target):
+        # Copy the page (its resources stay compressed) into a scratch document,
+        # then replace its contents with a single draw of this image filling a
+        # page of the target size. Returns None if the image can't be isolated.
+        name, referencer = img[7], img[9]
+        if referencer:
+            # Drawn from inside a Form XObject: its name isn't a page resource
+            return None
+        try:
+            with fitz.open() as scratch:
+                scratch.insert_pdf(doc, from_page=page.number, to_page=page.number)
+                scratch_page = scratch[0]
+                scratch_page.set_rotation(0)
+                scratch_page.set_mediabox(fitz.Rect(0, 0, target[0], target[1]))
+                scratch_page.clean_contents()
+                contents = scratch_page.get_contents()
+                if not contents:
+                    return None
+                scratch.update_stream(contents[0], f"q {target[0]} 0 0 {target[1]} 0 0 cm /{name} Do Q".encode())
+                pix = scratch_page.get_pixmap(alpha=False)
+                return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        except Exception:
+            return None
+
+    def _render_clip(self, page, img_bbox, target):
+        # MuPDF only decodes the image at the resolution the render needs
+        zoom = min(target[0] / img_bbox.width, target[1] / img_bbox.height)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=img_bbox, alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+    def _record(self, image):
+        decoded = image.width * image.height * len(image.getbands())
+        self.peak_decoded_bytes = max(self.peak_decoded_bytes, decoded)
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+
+import fitz  # PyMuPDF
+
+from .figure_extractor import image_content_hash, iter_figures
+from .analysis_job import analyze_figures
+from .text_analyzer import calculate_burstiness, calculate_perplexity
+from .model_detector import predict_text_class
+
+RECORD_VERSION = 1
+
+# Keys of a figure's data that are not written to the analysis record
+UNSTORED_FIGURE_KEYS = ("thumbnail",)
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+def page_fingerprints(pdf_path):
+    """
+    Fingerprints every page by its text and the content of its images.
+
+    Returns:
+        list: One dict per page with "text", "images" (content hashes in page
+              order) and "page", a hash of both that identifies the page.
+    """
+    fingerprints = []
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            text_hash = _sha256(page.get_text("text").encode("utf-8"))
+            image_hashes = [image_content_hash(doc, img[0]) for img in page.get_images(full=True)]
+            page_hash = _sha256((text_hash + "".join(image_hashes)).encode("ascii"))
+            fingerprints.append({"text": text_hash, "images": image_hashes, "page": page_hash})
+    return fingerprints
+
+def load_record(record_path):
+    """Loads a saved analysis record, or returns None if there is none."""
+    if not record_path or not os.path.exists(record_path):
+        return None
+    with open(record_path, "r", encoding="utf-8") as f:
+        record = json.load(f)
+    return record if record.get("version") == RECORD_VERSION else None
+
+def save_record(record, record_path):
+    tmp_path = record_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp_path, record_path)
+
+def analyze_text(text_to_analyze):
+    """Runs the text detectors that the analysis record stores."""
+    label, score = predict_text_class(text_to_analyze)
+    return {
+        "perplexity": calculate_perplexity(text_to_analyze),
+        "burstiness": float(calculate_burstiness(text_to_analyze)),
+        "label": label,
+        "score": score,
+    }
+
+def diff_pages(previous_pages, pages):
+    """
+    Matches pages by fingerprint, so inserting or removing a page does not mark
+    every page after it as changed.
+
+    Returns:
+        tuple: ({new page index: previous page index} for unchanged pages, diff summary)
+    """
+    previous_by_hash = {}
+    for index, fingerprint in enumerate(previous_pages):
+        previous_by_hash.setdefault(fingerprint["page"], []).append(index)
+
+    unchanged = {}
+    for index, fingerprint in enumerate(pages):
+        candidates = previous_by_hash.get(fingerprint["page"])
+        if candidates:
+            unchanged[index] = candidates.pop(0)
+
+    modified = [i for i in range(len(pages)) if i not in unchanged]
+    matched_previous = set(unchanged.values())
+    unmatched_previous = [i for i in range(len(previous_pages)) if i not in matched_previous]
+    # Extra unmatched pages on either side are additions or removals; the rest were edited
+    edited = min(len(modified), len(unmatched_previous))
+    summary = {
+        "unchanged": sorted(i + 1 for i in unchanged),
+        "changed": [i + 1 for i in modified[:edited]],
+        "added": [i + 1 for i in modified[edited:]],
+        "removed": [i + 1 for i in unmatched_previous[edited:]],
+    }
+    return unchanged, summary
+
+def analyze_revision(pdf_path, previous_record=None, output_dir="figures_output"):
+    """
+    Analyzes a PDF, redoing only what changed since `previous_record`.
+
+    Figures on unchanged pages are merged from the previous record. On changed
+    pages, images whose content was analyzed before reuse those results (with a
+    fresh caption); only new images are extracted and analyzed. The text
+    detectors rerun only if the analyzed text changed.
+
+    Args:
+        pdf_path (str): The new version of the PDF.
+        previous_record (dict): The record returned for an earlier version, or None
+            to analyze everything.
+        output_dir (str): Each revision's figures go in a sub-folder named after
+            its fingerprint, so files referenced by earlier records are kept.
+
+    Returns:
+        tuple: (record, diff report). Save the record with `save_record` and pass it
+               back in for the next version.
+    """
+    pages = page_fingerprints(pdf_path)
+    fingerprint = _sha256("".join(page["page"] for page in pages).encode("ascii"))
+    revision_dir = os.path.join(output_dir, fingerprint[:12])
+
+    previous_pages = previous_record["pages"] if previous_record else []
+    previous_figures = previous_record["figures"] if previous_record else []
+    unchanged, page_summary = diff_pages(previous_pages, pages)
+
+    # Figures on unchanged pages are copied over, renamed to where they now appear
+    pdf_name = os.path.basename(pdf_path)
+    figures_by_previous_page = {}
+    for data in previous_figures:
+        figures_by_previous_page.setdefault(data["page"] - 1, []).append(data)
+    merged = []
+    for index, previous_index in unchanged.items():
+        for data in figures_by_previous_page.get(previous_index, []):
+            data = dict(data)
+            data["page"] = index + 1
+            data["source"] = f"{pdf_name}, page {index + 1}"
+            merged.append(data)
+
+    # Changed pages are extracted, reusing any image content seen before
+    changed_pages = set(range(len(pages))) - set(unchanged)
+    known_figures = {data["content_hash"]: data for data in previous_figures if data.get("content_hash")}
+    reused_on_changed_pages, analyzed = 0, 0
+    if changed_pages:
+        figures = iter_figures(pdf_path, revision_dir, pages=changed_pages, known_figures=known_figures)
+        for data in analyze_figures(figures):
+            if "reused_from" in data:
+                reused_on_changed_pages += 1
+            else:
+                analyzed += 1
+            merged.append({key: value for key, value in data.items() if key not in UNSTORED_FIGURE_KEYS})
+    merged.sort(key=lambda data: data["page"])
+
+    # Text detectors, on the same first 500 words `main.analyze_document` uses
+    with fitz.open(pdf_path) as doc:
+        full_text = "".join(page.get_text("text") + "\n" for page in doc)
+    text_to_analyze = " ".join(full_text.split()[:500])
+    text_hash = _sha256(text_to_analyze.encode("utf-8"))
+    previous_text = previous_record.get("text_analysis") if previous_record else None
+    if previous_text and previous_text.get("text_hash") == text_hash:
+        text_analysis, text_status = previous_text, "reused"
+    else:
+        text_analysis, text_status = analyze_text(text_to_analyze), "rerun"
+        text_analysis["text_hash"] = text_hash
+
+    current_hashes = {data.get("content_hash") for data in merged}
+    report = {
+        "pages": page_summary,
+        "figures": {
+            "merged_from_unchanged_pages": len(merged) - reused_on_changed_pages - analyzed,
+            "reused_on_changed_pages": reused_on_changed_pages,
+            "analyzed": analyzed,
+            "removed": sum(1 for data in previous_figures if data.get("content_hash") not in current_hashes),
+        },
+        "text_analysis": text_status,
+    }
+    record = {
+        "version": RECORD_VERSION,
+        "pdf": pdf_name,
+        "fingerprint": fingerprint,
+        "pages": pages,
+        "figures": merged,
+        "text_analysis": text_analysis,
+    }
+    return record, report
+
+def print_diff_report(report):
+    pages = report["pages"]
+    figures = report["figures"]
+    print(f"Pages: {len(pages['unchanged'])} unchanged, {len(pages['changed'])} changed, "
+          f"{len(pages['added'])} added, {len(pages['removed'])} removed")
+    for kind in ("changed", "added", "removed"):
+        if pages[kind]:
+            print(f"-> {kind.capitalize()}: {', '.join(str(p) for p in pages[kind])}")
+    print(f"Figures: {figures['analyzed']} analyzed, {figures['reused_on_changed_pages']} reused on changed pages, "
+          f"{figures['merged_from_unchanged_pages']} merged from unchanged pages, {figures['removed']} removed")
+    print(f"Text detectors: {report['text_analysis']}")
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    sample_pdf = "2509.10564v1.pdf"
+    record_path = "analysis_record.json"
+
+    if os.path.exists(sample_pdf):
+        record, report = analyze_revision(sample_pdf, load_record(record_path))
+        save_record(record, record_path)
+        print_diff_report(report)
+        print(f"Record saved to '{record_path}'")
+    else:
+        print(f"Error: The file '{sample_pdf}' was not found.")
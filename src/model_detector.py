@@ -1,9 +1,21 @@
 from transformers import pipeline
 
-# Load a pre-trained model from Hugging Face Hub
-# This model is specifically trained to detect text from OpenAI's GPT models
+from .resource_governor import governed_stage
+
+# The RoBERTa model is specifically trained to detect text from OpenAI's GPT models.
+# It is loaded on first use (not at import) so callers such as the benchmark
+# suite can swap in a stub by assigning `model_detector.detector` beforehand.
 # Note: The first time you run this, it will download the model (a few hundred MB)
-detector = pipeline("text-classification", model="roberta-base-openai-detector")
+detector = None
+
+def load_detector():
+    """
+    Returns the text-classification pipeline, loading it on the first call.
+    """
+    global detector
+    if detector is None:
+        detector = pipeline("text-classification", model="roberta-base-openai-detector")
+    return detector
 
 def predict_text_class(text):
     """
@@ -13,7 +25,8 @@ def predict_text_class(text):
     if not text.strip():
         return "Unknown", 0.0
         
-    results = detector(text)
+    with governed_stage("text_detector"):
+        results = load_detector()(text)
     # The model outputs 'Real' for human and 'Fake' for AI. Let's standardize this.
     prediction = results[0]
     label = "Human" if prediction['label'] == 'Real' else "AI-Generated"
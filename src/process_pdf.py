@@ -3,14 +3,21 @@ import os
 import io
 from PIL import Image
 
-def process_scholarly_pdf(pdf_path, output_folder="processed_output"):
+from .image_decoding import ImageDecoder
+
+def process_scholarly_pdf(pdf_path, output_folder="processed_output", decoder=None):
     """
     Extracts text and images from a given scholarly PDF file.
 
     Args:
         pdf_path (str): The file path to the PDF.
         output_folder (str): The folder to save extracted content.
+        decoder (ImageDecoder): Limits the resolution huge images are decoded at.
+            Images it reduces are saved as PNG. Defaults to `ImageDecoder()`.
     """
+    if decoder is None:
+        decoder = ImageDecoder()
+
     # Create output directory if it doesn't exist
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
@@ -42,15 +49,17 @@ def process_scholarly_pdf(pdf_path, output_folder="processed_output"):
 
             for img_index, img in enumerate(image_list):
                 xref = img[0]
-                base_image = doc.extract_image(xref)
-                image_bytes = base_image["image"]
-                
-                # Get the image extension
-                image_ext = base_image["ext"]
-                
+
                 # Load it to PIL
                 try:
-                    image = Image.open(io.BytesIO(image_bytes))
+                    if decoder.needs_reduction(img):
+                        image = decoder.decode(doc, page, img)
+                        image_ext = "png"
+                    else:
+                        base_image = doc.extract_image(xref)
+                        image = Image.open(io.BytesIO(base_image["image"]))
+                        # Get the image extension
+                        image_ext = base_image["ext"]
                     
                     # Save the image
                     image_filename = f"image_p{page_num+1}_{img_index+1}.{image_ext}"
@@ -61,6 +70,12 @@ def process_scholarly_pdf(pdf_path, output_folder="processed_output"):
                     print(f"Warning: Could not process an image on page {page_num+1}. Error: {e}")
 
         print(f"Extracted and saved {image_count} images.")
+        if decoder.reduced:
+            stats = decoder.stats()
+            print(f"{stats['reduced']} oversized images were decoded at reduced resolution, "
+                  f"avoiding {stats['bytes_avoided'] / 1e6:.0f} MB of decoded pixels.")
+            if stats["unbounded_decodes"]:
+                print(f"Warning: {stats['unbounded_decodes']} images had to be decoded at full resolution first.")
 
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import torch
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; child-process CPU time is then not counted
+    resource = None
+
+# Stages backed by a neural model. They share one set of slots, so the image
+# detector of one session can't run alongside the perplexity model of another.
+MODEL_STAGES = ("perplexity", "text_detector", "image_detector", "similarity")
+
+# CPU-heavy stages that are not models
+CPU_STAGES = ("ocr", "opencv")
+
+_lock = threading.Lock()
+_budget = None
+_cpu_slots = None
+_model_slots = None
+_stage_stats = {}
+_started_wall = time.perf_counter()
+
+def child_cpu_seconds():
+    """
+    CPU seconds used by finished child processes, e.g. the Tesseract runs that
+    pytesseract spawns (which `time.process_time` does not include).
+    """
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+_started_cpu = time.process_time()
+_started_child_cpu = child_cpu_seconds()
+
+def plan_budget(workers=1, cores=None, concurrent_jobs=1, model_concurrency=1, tesseract_threads=1):
+    """
+    Splits the machine's cores between `workers` processes, then between the
+    `concurrent_jobs` documents each process analyzes at once (e.g. Streamlit
+    sessions sharing the server process).
+
+    At most `concurrent_jobs` governed stages run at a time in a process, each
+    with one job's share of threads, so together they never exceed the worker's
+    cores. Model stages are further limited to `model_concurrency` at a time.
+    Tesseract defaults to a single thread: its OpenMP threads cost more than
+    they gain on figure-sized images.
+
+    Returns:
+        dict: Per-worker cores and, per stage, its thread count and concurrency cap.
+    """
+    cores = cores or os.cpu_count() or 1
+    workers = max(1, workers)
+    per_worker = max(1, cores // workers)
+    concurrent_jobs = max(1, min(concurrent_jobs, per_worker))
+    share = max(1, per_worker // concurrent_jobs)
+    model_concurrency = max(1, min(model_concurrency, concurrent_jobs))
+    return {
+        "cores": cores,
+        "workers": workers,
+        "worker_cores": per_worker,
+        "concurrent_jobs": concurrent_jobs,
+        "stages": {
+            "model": {"threads": share, "concurrency": model_concurrency},
+            "opencv": {"threads": share, "concurrency": concurrent_jobs},
+            "ocr": {"threads": min(max(1, tesseract_threads), share), "concurrency": concurrent_jobs},
+        },
+    }
+
+def configure(workers=1, cores=None, concurrent_jobs=1, model_concurrency=1, tesseract_threads=1):
+    """
+    Applies a thread budget to this process and caps concurrent stages.
+
+    Call once per process before any analysis, e.g. at app start-up or as a
+    process pool `initializer` (see `worker_initializer`).
+
+    Returns:
+        dict: The budget that was applied.
+    """
+    global _budget, _cpu_slots, _model_slots
+    budget = plan_budget(workers, cores, concurrent_jobs, model_concurrency, tesseract_threads)
+    stages = budget["stages"]
+
+    torch.set_num_threads(stages["model"]["threads"])
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before torch has started any parallel work
+        pass
+    cv2.setNumThreads(stages["opencv"]["threads"])
+    # Read by each Tesseract subprocess that pytesseract spawns from now on
+    os.environ["OMP_THREAD_LIMIT"] = str(stages["ocr"]["threads"])
+
+    with _lock:
+        _budget = budget
+        _cpu_slots = threading.BoundedSemaphore(budget["concurrent_jobs"])
+        _model_slots = threading.BoundedSemaphore(stages["model"]["concurrency"])
+    reset_stats()
+    return budget
+
+def worker_initializer(workers, cores=None, concurrent_jobs=1, model_concurrency=1, tesseract_threads=1):
+    """
+    `ProcessPoolExecutor` initializer giving each worker its share of the cores.
+    """
+    configure(workers=workers, cores=cores, concurrent_jobs=concurrent_jobs,
+              model_concurrency=model_concurrency, tesseract_threads=tesseract_threads)
+
+@contextmanager
+def governed_stage(name):
+    """
+    Runs a block as pipeline stage `name`: once `configure` has been called, it
+    waits for a free slot (a model slot first for model stages, then one of the
+    shared CPU slots), then records its wall time, wait time and calls for
+    `utilization_report`. Governed stages must not be nested.
+    """
+    slots = []
+    if _model_slots is not None and name in MODEL_STAGES:
+        slots.append(_model_slots)
+    if _cpu_slots is not None and (name in MODEL_STAGES or name in CPU_STAGES):
+        slots.append(_cpu_slots)
+
+    requested = time.perf_counter()
+    for slot in slots:
+        slot.acquire()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        finished = time.perf_counter()
+        for slot in reversed(slots):
+            slot.release()
+        with _lock:
+            stats = _stage_stats.setdefault(name, {"calls": 0, "busy_seconds": 0.0, "wait_seconds": 0.0})
+            stats["calls"] += 1
+            stats["busy_seconds"] += finished - started
+            stats["wait_seconds"] += started - requested
+
+def reset_stats():
+    global _started_wall, _started_cpu, _started_child_cpu
+    with _lock:
+        _stage_stats.clear()
+        _started_wall = time.perf_counter()
+        _started_cpu = time.process_time()
+        _started_child_cpu = child_cpu_seconds()
+
+def utilization_report():
+    """
+    Summarizes CPU use since the last `configure`/`reset_stats` call.
+
+    Returns:
+        dict: Process wall and CPU seconds (including finished child processes
+              such as Tesseract, also reported on their own), CPU utilization as
+              a fraction of the cores budgeted to this process, and per-stage
+              timings.
+    """
+    wall = time.perf_counter() - _started_wall
+    child_cpu = child_cpu_seconds() - _started_child_cpu
+    cpu = time.process_time() - _started_cpu + child_cpu
+    budget = _budget or plan_budget()
+    cores = budget["worker_cores"]
+    with _lock:
+        stages = {name: dict(stats) for name, stats in _stage_stats.items()}
+    return {
+        "budget": budget,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "child_cpu_seconds": child_cpu,
+        "cpu_utilization": cpu / (wall * cores) if wall > 0 else 0.0,
+        "stages": stages,
+    }
+
+def print_utilization_report(report=None):
+    report = report or utilization_report()
+    print(f"CPU: {report['cpu_seconds']:.2f}s over {report['wall_seconds']:.2f}s wall "
+          f"({report['cpu_utilization']:.0%} of {report['budget']['worker_cores']} budgeted cores, "
+          f"{report['child_cpu_seconds']:.2f}s of it in child processes)")
+    for name, stats in sorted(report["stages"].items()):
+        print(f"-> {name}: {stats['calls']} calls, {stats['busy_seconds']:.2f}s busy, "
+              f"{stats['wait_seconds']:.2f}s waiting for a slot")
@@ -3,6 +3,8 @@ from transformers import GPT2LMHeadModel, GPT2Tokenizer
 import numpy as np
 import nltk
 
+from .resource_governor import governed_stage
+
 # This is the corrected, more robust way to handle the download
 try:
     nltk.data.find('tokenizers/punkt')
@@ -10,39 +12,56 @@ except LookupError:
     print("NLTK 'punkt' tokenizer not found. Downloading...")
     nltk.download('punkt')
 
-# Load a pre-trained model and tokenizer for perplexity calculation
-# (The rest of your code stays the same)
+# Pre-trained model and tokenizer for perplexity calculation.
+# Both are loaded on first use; assign `model` and `tokenizer` beforehand to use others.
 model_name = "gpt2"
-model = GPT2LMHeadModel.from_pretrained(model_name)
-tokenizer = GPT2Tokenizer.from_pretrained(model_name)
+model = None
+tokenizer = None
+
+def load_perplexity_model():
+    """Returns the (model, tokenizer) pair, loading GPT-2 on the first call."""
+    global model, tokenizer
+    if model is None:
+        model = GPT2LMHeadModel.from_pretrained(model_name)
+    if tokenizer is None:
+        tokenizer = GPT2Tokenizer.from_pretrained(model_name)
+    return model, tokenizer
 
-def calculate_perplexity(text):
-    """Calculates the perplexity of a given text using GPT-2."""
+def calculate_perplexity(text, max_tokens=None):
+    """
+    Calculates the perplexity of a given text using GPT-2.
+    With `max_tokens`, only that many leading tokens are scored (a cheaper estimate).
+    """
     if not text.strip():
         return 0.0
-        
+
+    model, tokenizer = load_perplexity_model()
     encodings = tokenizer(text, return_tensors="pt")
+    all_input_ids = encodings.input_ids
+    if max_tokens:
+        all_input_ids = all_input_ids[:, :max_tokens]
     max_length = model.config.n_positions
     stride = 512
-    seq_len = encodings.input_ids.size(1)
+    seq_len = all_input_ids.size(1)
 
-    nlls = []
-    prev_end_loc = 0
-    for begin_loc in range(0, seq_len, stride):
-        end_loc = min(begin_loc + max_length, seq_len)
-        trg_len = end_loc - prev_end_loc
-        input_ids = encodings.input_ids[:, begin_loc:end_loc]
-        target_ids = input_ids.clone()
-        target_ids[:, :-trg_len] = -100
+    with governed_stage("perplexity"):
+        nlls = []
+        prev_end_loc = 0
+        for begin_loc in range(0, seq_len, stride):
+            end_loc = min(begin_loc + max_length, seq_len)
+            trg_len = end_loc - prev_end_loc
+            input_ids = all_input_ids[:, begin_loc:end_loc]
+            target_ids = input_ids.clone()
+            target_ids[:, :-trg_len] = -100
 
-        with torch.no_grad():
-            outputs = model(input_ids, labels=target_ids)
-            neg_log_likelihood = outputs.loss
+            with torch.no_grad():
+                outputs = model(input_ids, labels=target_ids)
+                neg_log_likelihood = outputs.loss
 
-        nlls.append(neg_log_likelihood)
-        prev_end_loc = end_loc
-        if end_loc == seq_len:
-            break
+            nlls.append(neg_log_likelihood)
+            prev_end_loc = end_loc
+            if end_loc == seq_len:
+                break
 
     ppl = torch.exp(torch.stack(nlls).mean())
     return ppl.item()
@@ -8,6 +8,7 @@ import spacy
 
 # We need the OCR function from our other module for the test section
 from .figure_extractor import ocr_text_from_image
+from .resource_governor import governed_stage
 
 # Load the spaCy model once when the script is loaded
 try:
@@ -22,14 +23,15 @@ def is_table(image_path, horiz_thresh=10, vert_thresh=15):
     """
     if not os.path.exists(image_path):
         return False
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    thresh = cv2.adaptiveThreshold(~image, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 15, -2)
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
-    detect_horizontal = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, horizontal_kernel, iterations=2)
-    contours_h, _ = cv2.findContours(detect_horizontal, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    detect_vertical = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, vertical_kernel, iterations=2)
-    contours_v, _ = cv2.findContours(detect_vertical, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    with governed_stage("opencv"):
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        thresh = cv2.adaptiveThreshold(~image, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 15, -2)
+        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
+        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+        detect_horizontal = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, horizontal_kernel, iterations=2)
+        contours_h, _ = cv2.findContours(detect_horizontal, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        detect_vertical = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, vertical_kernel, iterations=2)
+        contours_v, _ = cv2.findContours(detect_vertical, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if len(contours_h) > horiz_thresh and len(contours_v) > vert_thresh:
         return True
     return False
@@ -53,7 +55,8 @@ def parse_table(image_path):
         if w < 20 or h < 20 or w > image.shape[1] * 0.8:
             continue
         cell_image = image[y:y+h, x:x+w]
-        text = pytesseract.image_to_string(cell_image, config='--psm 6').strip()
+        with governed_stage("ocr"):
+            text = pytesseract.image_to_string(cell_image, config='--psm 6').strip()
         if last_y != -1 and y > last_y + h * 0.5:
             table_data.append(current_row)
             current_row = []
@@ -109,9 +112,10 @@ def estimate_complexity(image_path, ocr_text=""):
     text_score = len(ocr_text.split()) / 15  # Tuned scaling factor
     
     # 2. Visual Complexity (based on number of contours/shapes)
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    edges = cv2.Canny(image, 100, 200)
-    contours, _ = cv2.findContours(edges, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    with governed_stage("opencv"):
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        edges = cv2.Canny(image, 100, 200)
+        contours, _ = cv2.findContours(edges, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
     visual_score = len(contours) / 300 # Tuned scaling factor
 
     # Combine scores and cap at 10